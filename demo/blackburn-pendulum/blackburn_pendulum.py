@@ -1,3 +1,5 @@
+from multiprocessing import Pool
+
 import numpy as np
 from numpy.random import uniform
 from scipy.integrate import odeint
@@ -34,26 +36,71 @@ bounds = [(-1e-2, 1e-2),
 def get_random_init_conds(bounds):
     return [uniform(*b) for b in bounds]
 
-def make_plot(soln, l0, l1, fname):
+def make_plot(cis, fname):
     import matplotlib
-    matplotlib.use('png')
+    matplotlib.use('Agg')
     import matplotlib.pyplot as plt
-    cis = curve_in_space(soln[:,0], soln[:,1], l0, l1)
     plt.plot(*cis)
     plt.savefig(fname)
     plt.close('all')
-    
-def main(N):
-    t = np.linspace(0, 1000., 5000)
-    l0 = 1.0
-    g = 1.0
+
+T = np.linspace(0, 1000., 5000)
+L0 = 1.0
+G = 1.0
+
+def frame(params):
+    """ The curve in space traced by the pendulum, for initial conditions
+    and lower length `params`.
+    """
+    ics, l1 = params
+    soln = odeint(f, ics, T, args=(L0, l1, G))
+    return np.array(curve_in_space(soln[:,0], soln[:,1], L0, l1))
+
+def write_curves(params, filename):
+    """ Computes `frame(p)` for each `p` in `params` in worker processes,
+    writing the curves in order to the memory-mapped .npy stack `filename`,
+    so they need not all fit in memory.
+    """
+    curves = np.lib.format.open_memmap(filename, mode='w+',
+                                       shape=(len(params), 2, len(T)))
+    pool = Pool()
+    try:
+        for i, curve in enumerate(pool.imap(frame, params)):
+            curves[i] = curve
+            print "{} / {}".format(i + 1, len(params))
+    finally:
+        pool.close()
+        pool.join()
+    curves.flush()
+
+def _plot_curve(args):
+    filename, index, fname = args
+    make_plot(np.load(filename, mmap_mode='r')[index], fname)
+
+def plot_curves(filename, fnames):
+    """ Plots each curve in the .npy stack `filename` to the corresponding
+    PNG file in `fnames`, in worker processes.
+    """
+    pool = Pool()
+    try:
+        pool.map(_plot_curve, [(filename, i, fname)
+                               for i, fname in enumerate(fnames)])
+    finally:
+        pool.close()
+        pool.join()
+
+def main(N, filename='blackburn_pendulum.npy', png=True):
+    # Draw the parameters here: forked workers would share a random state.
+    params = []
     for _ in range(N):
-        print "{} / {}".format(_+1, N)
         ics = get_random_init_conds(bounds)
         l1, = get_random_init_conds([(0.01, 2.0)])
-        soln = odeint(f, ics, t, args=(l0, l1, g))
-        fname = "blackburn_pendulum_{}_{}_{}_{}_{}.png".format(*(ics + [l1]))
-        make_plot(soln, l0, l1, fname)
+        params.append((ics, l1))
+    write_curves(params, filename)
+    if png:
+        fnames = ["blackburn_pendulum_{}_{}_{}_{}_{}.png".format(*(ics + [l1]))
+                  for ics, l1 in params]
+        plot_curves(filename, fnames)
     
 if __name__ == '__main__':
     main(100)
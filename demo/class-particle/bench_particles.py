@@ -0,0 +1,40 @@
+'''
+bench_particles.py
+
+Times creating and destroying many short-lived particles with each way of
+storing their position and velocity: `particle_heap.Particle` with a malloc
+per array, the same class with its block pool, and the inline arrays of
+`particle.Particle`.
+
+    $ make && python bench_particles.py
+'''
+
+from __future__ import print_function
+
+import timeit
+
+import particle
+import particle_heap
+
+def churn(cls, batches=200, batch_size=1000):
+    ''' Creates `batches` batches of `batch_size` particles, dropping each
+    batch before creating the next, like an event loop would.
+    '''
+    for _ in range(batches):
+        batch = [cls() for _ in range(batch_size)]
+        del batch
+
+def bench(label, cls, pooled=False, repeat=5):
+    particle_heap.use_pool(pooled)
+    try:
+        runtime = min(timeit.repeat(lambda: churn(cls), number=1,
+                                    repeat=repeat))
+    finally:
+        particle_heap.use_pool(False)
+    print("{:<30s} {:8.3f} s".format(label, runtime))
+
+if __name__ == '__main__':
+    bench("particle_heap, malloc", particle_heap.Particle)
+    bench("particle_heap, pooled", particle_heap.Particle, pooled=True)
+    bench("particle, inline arrays", particle.Particle)
+    print("pool stats:", particle_heap.pool_stats())
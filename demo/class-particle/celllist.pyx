@@ -0,0 +1,270 @@
+cimport cython
+from libc.math cimport floor
+from libc.stdint cimport int32_t, int64_t
+from libc.stdlib cimport realloc, free
+from libc.string cimport memcpy
+import numpy as np
+
+# --- At most this many cells per particle are allocated ----------------------
+DEF MAX_CELLS_PER_PARTICLE = 4
+
+# A growable array of pairs, for `CellList.pairs` without `out`.
+cdef struct PairBuffer:
+    int32_t *data
+    int64_t size, capacity
+
+cdef inline void append_pair(PairBuffer *buf, int32_t i,
+                             int32_t j) noexcept nogil:
+    # Appends (i, j), doubling the capacity when full.  If that fails, the
+    # pair is dropped, so `size` falls behind the number of pairs found.
+    cdef:
+        int64_t capacity = max(2 * buf.capacity, 1024)
+        int32_t *data
+    if buf.size == buf.capacity:
+        data = <int32_t *>realloc(buf.data, 2 * sizeof(int32_t) * capacity)
+        if data == NULL:
+            return
+        buf.data = data
+        buf.capacity = capacity
+    buf.data[2 * buf.size] = i
+    buf.data[2 * buf.size + 1] = j
+    buf.size += 1
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+cdef class CellList:
+    '''
+    A uniform grid of cells over particle positions, for finding the
+    particles within `cutoff` of each other or of a point.
+
+    `positions` is a C-contiguous (3, n) float32 array, such as
+    `ParticleArray.position`, which is used in place (not copied), so that
+    `update` sees the particles move.  The cells are at least `cutoff` +
+    `skin` wide, so after the particles move, the cells are still valid for
+    queries up to `cutoff` while no particle has moved more than `skin` / 2;
+    `update` only rebuilds them once one has.
+    '''
+
+    cdef:
+        readonly object positions
+        float[:, ::1] psn
+        float[:, ::1] built_psn
+        readonly float cutoff, skin
+        readonly int rebuilds
+        float lo[3]
+        float width[3]
+        int ncells[3]
+        int32_t[::1] cell_start
+        int32_t[::1] order
+
+    def __init__(self, positions, float cutoff, float skin=0.0):
+        if cutoff <= 0 or skin < 0:
+            raise ValueError("cutoff must be positive and skin non-negative")
+        if (not isinstance(positions, np.ndarray) or
+                positions.dtype != np.float32 or positions.ndim != 2 or
+                positions.shape[0] != 3 or
+                not positions.flags.c_contiguous):
+            raise ValueError("positions must be a C-contiguous float32 array "
+                             "of shape (3, n), to be tracked in place")
+        self.positions = positions
+        self.psn = positions
+        self.cutoff = cutoff
+        self.skin = skin
+        self.rebuilds = 0
+        self.build()
+
+    def __len__(self):
+        return self.psn.shape[1]
+
+    def build(self):
+        ''' Sorts the particles into cells at their current positions. '''
+        cdef:
+            Py_ssize_t i, n = self.psn.shape[1]
+            int k, c
+            float min_width = self.cutoff + self.skin
+            double total
+            int32_t[::1] cell_of = np.empty(n, dtype=np.int32)
+            int32_t[::1] fill
+
+        self.built_psn = np.array(self.positions)
+        for k in range(3):
+            lo = self.positions[k].min() if n else 0.0
+            hi = self.positions[k].max() if n else 0.0
+            self.lo[k] = lo
+            self.ncells[k] = max(1, int((hi - lo) / min_width))
+        # Coarsen the grid if it would have too many (mostly empty) cells.
+        total = <double>self.ncells[0] * self.ncells[1] * self.ncells[2]
+        if total > MAX_CELLS_PER_PARTICLE * max(n, 1):
+            scale = (total / (MAX_CELLS_PER_PARTICLE * max(n, 1))) ** (1 / 3.)
+            for k in range(3):
+                self.ncells[k] = max(1, int(self.ncells[k] / scale))
+        for k in range(3):
+            hi = self.positions[k].max() if n else 0.0
+            self.width[k] = max((hi - self.lo[k]) / self.ncells[k], min_width)
+
+        # A counting sort of the particles by cell.
+        self.cell_start = np.zeros(
+                self.ncells[0] * self.ncells[1] * self.ncells[2] + 1,
+                dtype=np.int32)
+        self.order = np.empty(n, dtype=np.int32)
+        fill = np.empty(self.cell_start.shape[0], dtype=np.int32)
+        with nogil:
+            for i in range(n):
+                c = self.cell_index(self.psn[0, i], self.psn[1, i],
+                                    self.psn[2, i])
+                cell_of[i] = c
+                self.cell_start[c + 1] += 1
+            for c in range(1, self.cell_start.shape[0]):
+                self.cell_start[c] += self.cell_start[c - 1]
+            for c in range(self.cell_start.shape[0]):
+                fill[c] = self.cell_start[c]
+            for i in range(n):
+                self.order[fill[cell_of[i]]] = i
+                fill[cell_of[i]] += 1
+        self.rebuilds += 1
+
+    def update(self):
+        '''
+        Call after the particles have moved: rebuilds the cells if any
+        particle has moved more than `skin` / 2 since they were built.
+        Returns whether they were rebuilt.
+        '''
+        cdef:
+            Py_ssize_t i, n = self.psn.shape[1]
+            float dx, dy, dz, d2, max_d2 = 0, limit = self.skin / 2
+        with nogil:
+            for i in range(n):
+                dx = self.psn[0, i] - self.built_psn[0, i]
+                dy = self.psn[1, i] - self.built_psn[1, i]
+                dz = self.psn[2, i] - self.built_psn[2, i]
+                d2 = dx * dx + dy * dy + dz * dz
+                if d2 > max_d2:
+                    max_d2 = d2
+        if max_d2 > limit * limit:
+            self.build()
+            return True
+        return False
+
+    cdef inline int cell_coord(self, float x, int k) noexcept nogil:
+        # Points outside the grid are put in the nearest cell on its edge;
+        # that keeps points within a cell width of each other in the same or
+        # neighbouring cells.
+        cdef int c = <int>floor((x - self.lo[k]) / self.width[k])
+        return min(max(c, 0), self.ncells[k] - 1)
+
+    cdef inline int cell_index(self, float x, float y, float z) noexcept nogil:
+        return ((self.cell_coord(x, 0) * self.ncells[1] +
+                 self.cell_coord(y, 1)) * self.ncells[2] +
+                self.cell_coord(z, 2))
+
+    def query_radius(self, point, float r):
+        '''
+        Returns the indices of the particles within `r` (at most `cutoff`)
+        of `point`, in increasing order.
+        '''
+        if r > self.cutoff:
+            raise ValueError("r must be at most the cutoff, %g" % self.cutoff)
+        cdef:
+            float px, py, pz, dx, dy, dz, r2 = r * r
+            int cx, cy, cz, ix, iy, iz, c
+            Py_ssize_t s, i
+        px, py, pz = point
+        found = []
+        cx, cy, cz = (self.cell_coord(px, 0), self.cell_coord(py, 1),
+                      self.cell_coord(pz, 2))
+        for ix in range(max(cx - 1, 0), min(cx + 2, self.ncells[0])):
+            for iy in range(max(cy - 1, 0), min(cy + 2, self.ncells[1])):
+                for iz in range(max(cz - 1, 0), min(cz + 2, self.ncells[2])):
+                    c = (ix * self.ncells[1] + iy) * self.ncells[2] + iz
+                    for s in range(self.cell_start[c], self.cell_start[c + 1]):
+                        i = self.order[s]
+                        dx = self.psn[0, i] - px
+                        dy = self.psn[1, i] - py
+                        dz = self.psn[2, i] - pz
+                        if dx * dx + dy * dy + dz * dz <= r2:
+                            found.append(i)
+        found.sort()
+        return np.array(found, dtype=np.intp)
+
+    def pairs(self, out=None):
+        '''
+        Finds every pair of particles (i, j), i < j, within `cutoff` of each
+        other.
+
+        With `out`, an (m, 2) int32 array, writes up to m pairs into it and
+        returns the total number of pairs, which may be more than m: then
+        call again with a larger `out`.  Without it, returns a new array of
+        all the pairs, found in a single pass into a growing buffer.
+        '''
+        cdef:
+            int32_t[:, ::1] pairs_view
+            int64_t count
+            PairBuffer extra
+        if out is not None:
+            pairs_view = out
+            with nogil:
+                count = self.find_pairs(pairs_view, NULL)
+            return count
+        pairs_view = np.empty((0, 2), dtype=np.int32)
+        extra.data, extra.size, extra.capacity = NULL, 0, 0
+        try:
+            with nogil:
+                count = self.find_pairs(pairs_view, &extra)
+            if extra.size < count:
+                raise MemoryError()
+            out = np.empty((count, 2), dtype=np.int32)
+            if count:
+                pairs_view = out
+                memcpy(&pairs_view[0, 0], extra.data,
+                       count * 2 * sizeof(int32_t))
+            return out
+        finally:
+            free(extra.data)
+
+    cdef int64_t find_pairs(self, int32_t[:, ::1] out,
+                            PairBuffer *extra) noexcept nogil:
+        # Compares each cell with itself and the 13 neighbouring cells "after"
+        # it, so each pair of cells is visited once.  Pairs that do not fit in
+        # `out` are appended to `extra`, if given.
+        cdef:
+            int64_t count = 0
+            int ix, iy, iz, jx, jy, jz, dx, dy, dz, a, b
+            Py_ssize_t s, t, t0, i, j
+            float r2 = self.cutoff * self.cutoff, ex, ey, ez
+        for ix in range(self.ncells[0]):
+            for iy in range(self.ncells[1]):
+                for iz in range(self.ncells[2]):
+                    a = (ix * self.ncells[1] + iy) * self.ncells[2] + iz
+                    for dx in range(0, 2):
+                        for dy in range(-1, 2):
+                            for dz in range(-1, 2):
+                                # Only the half of the neighbours after `a`.
+                                if dx == 0 and (dy < 0 or dy == 0 and dz < 0):
+                                    continue
+                                jx, jy, jz = ix + dx, iy + dy, iz + dz
+                                if not (jx < self.ncells[0] and
+                                        0 <= jy < self.ncells[1] and
+                                        0 <= jz < self.ncells[2]):
+                                    continue
+                                b = (jx * self.ncells[1] + jy) * \
+                                    self.ncells[2] + jz
+                                for s in range(self.cell_start[a],
+                                               self.cell_start[a + 1]):
+                                    i = self.order[s]
+                                    t0 = s + 1 if a == b else self.cell_start[b]
+                                    for t in range(t0, self.cell_start[b + 1]):
+                                        j = self.order[t]
+                                        ex = self.psn[0, i] - self.psn[0, j]
+                                        ey = self.psn[1, i] - self.psn[1, j]
+                                        ez = self.psn[2, i] - self.psn[2, j]
+                                        if ex * ex + ey * ey + ez * ez > r2:
+                                            continue
+                                        if count < out.shape[0]:
+                                            out[count, 0] = min(i, j)
+                                            out[count, 1] = max(i, j)
+                                        elif extra != NULL:
+                                            append_pair(extra, min(i, j),
+                                                        max(i, j))
+                                        count += 1
+        return count
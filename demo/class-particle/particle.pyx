@@ -1,4 +1,5 @@
 cimport cython
+from cython.parallel cimport prange
 from libc.math cimport sqrt
 
 DEF _LEN = 3
@@ -63,3 +64,393 @@ cdef class Particle:
         def __get__(self):
             cdef float spd = self.speed
             return tuple(self.vel[i] / spd for i in range(_LEN))
+
+# --- Columns of a ParticleArray's table --------------------------------------
+DEF X = 0
+DEF VX = 3
+DEF MASS = 6
+DEF CHARGE = 7
+DEF _NCOLS = 8
+# --- Particles advanced in lock-step by `ParticleArray.step` -----------------
+DEF BLOCK = 16
+
+cdef class ParticleArray:
+    '''
+    `n` particles stored as a structure of arrays: an (8, n) float32 table
+    whose rows are the x, y, z, vx, vy, vz, mass and charge columns.
+
+    The columns are exposed as NumPy views (`x`, ..., `position`,
+    `velocity`), and the table itself through the buffer protocol, so
+    `np.asarray(particles)` does not copy.  Indexing returns a
+    `ParticleProxy` that reads and writes the table in place.
+    '''
+
+    cdef:
+        readonly object table
+        float[:, ::1] cols
+        readonly Py_ssize_t n
+        Py_ssize_t shape[2]
+        Py_ssize_t strides[2]
+
+    def __cinit__(self, Py_ssize_t n=0):
+        # Allocated once, here, rather than in __init__: the buffer protocol
+        # hands out pointers into the table, so it must never be replaced.
+        import numpy as np
+        self.table = np.zeros((_NCOLS, n), dtype=np.float32)
+        self.cols = self.table
+        self.n = n
+        self.shape[0], self.shape[1] = _NCOLS, n
+        self.strides[0], self.strides[1] = n * sizeof(float), sizeof(float)
+
+    @classmethod
+    def from_particles(cls, particles):
+        ''' A ParticleArray holding copies of the `Particle`s in
+        `particles`.
+        '''
+        particles = list(particles)
+        cdef ParticleArray pa = cls(len(particles))
+        for i, p in enumerate(particles):
+            pa[i] = p
+        return pa
+
+    def __len__(self):
+        return self.n
+
+    cdef Py_ssize_t _index(self, Py_ssize_t i) except -1:
+        if i < 0:
+            i += self.n
+        if not 0 <= i < self.n:
+            raise IndexError("particle index out of range")
+        return i
+
+    def __getitem__(self, Py_ssize_t i):
+        return ParticleProxy(self, self._index(i))
+
+    def __setitem__(self, Py_ssize_t i, p):
+        i = self._index(i)
+        self.table[X:X + _LEN, i] = p.position
+        self.table[VX:VX + _LEN, i] = p.velocity
+        self.cols[MASS, i] = p.mass
+        self.cols[CHARGE, i] = p.charge
+
+    def __getbuffer__(self, Py_buffer *buf, int flags):
+        buf.buf = <char *>&self.cols[0, 0] if self.n else NULL
+        buf.obj = self
+        buf.len = _NCOLS * self.n * sizeof(float)
+        buf.readonly = 0
+        buf.itemsize = sizeof(float)
+        buf.format = 'f'
+        buf.ndim = 2
+        buf.shape = self.shape
+        buf.strides = self.strides
+        buf.suboffsets = NULL
+        buf.internal = NULL
+
+    def __releasebuffer__(self, Py_buffer *buf):
+        pass
+
+    property x:
+        def __get__(self):
+            return self.table[X]
+
+    property y:
+        def __get__(self):
+            return self.table[X + 1]
+
+    property z:
+        def __get__(self):
+            return self.table[X + 2]
+
+    property vx:
+        def __get__(self):
+            return self.table[VX]
+
+    property vy:
+        def __get__(self):
+            return self.table[VX + 1]
+
+    property vz:
+        def __get__(self):
+            return self.table[VX + 2]
+
+    property mass:
+        def __get__(self):
+            return self.table[MASS]
+
+    property charge:
+        def __get__(self):
+            return self.table[CHARGE]
+
+    property position:
+
+        "(3, n) view of the positions."
+
+        def __get__(self):
+            return self.table[X:X + _LEN]
+
+    property velocity:
+
+        "(3, n) view of the velocities."
+
+        def __get__(self):
+            return self.table[VX:VX + _LEN]
+
+    def _out(self, out, shape):
+        import numpy as np
+        if out is None:
+            return np.empty(shape, dtype=np.float32)
+        if out.shape != shape or out.dtype != np.float32:
+            raise ValueError("out must be a float32 array of shape %r"
+                             % (shape,))
+        return out
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    def speed(self, out=None):
+        ''' The speed of each particle, as an (n,) array. '''
+        out = self._out(out, (self.n,))
+        cdef float[::1] spd = out
+        cdef Py_ssize_t i
+        with nogil:
+            for i in range(self.n):
+                spd[i] = sqrt(self.cols[VX, i] * self.cols[VX, i] +
+                              self.cols[VX + 1, i] * self.cols[VX + 1, i] +
+                              self.cols[VX + 2, i] * self.cols[VX + 2, i])
+        return out
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    def momentum(self, out=None):
+        ''' The momentum of each particle, as a (3, n) array. '''
+        out = self._out(out, (_LEN, self.n))
+        cdef float[:, ::1] mom = out
+        cdef Py_ssize_t i, k
+        with nogil:
+            for k in range(_LEN):
+                for i in range(self.n):
+                    mom[k, i] = self.cols[VX + k, i] * self.cols[MASS, i]
+        return out
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    @cython.cdivision(True)
+    def direction(self, out=None):
+        ''' The unit vector along each particle's velocity, as a (3, n)
+        array; NaN for particles at rest.
+        '''
+        out = self._out(out, (_LEN, self.n))
+        cdef float[:, ::1] drn = out
+        cdef float spd
+        cdef Py_ssize_t i, k
+        with nogil:
+            for i in range(self.n):
+                spd = sqrt(self.cols[VX, i] * self.cols[VX, i] +
+                           self.cols[VX + 1, i] * self.cols[VX + 1, i] +
+                           self.cols[VX + 2, i] * self.cols[VX + 2, i])
+                for k in range(_LEN):
+                    drn[k, i] = self.cols[VX + k, i] / spd
+        return out
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    def rms_speed(self):
+        ''' The root-mean-square speed of the particles. '''
+        cdef double total = 0.0
+        cdef Py_ssize_t i, k
+        if not self.n:
+            return 0.0
+        with nogil:
+            for k in range(VX, VX + _LEN):
+                for i in range(self.n):
+                    total += self.cols[k, i] * self.cols[k, i]
+        return sqrt(total / self.n)
+
+    def step(self, float dt, Py_ssize_t n_steps=1, E=None, B=None,
+             Py_ssize_t every=0, snapshots=None, int num_threads=1):
+        '''
+        Advances the particles `n_steps` steps of `dt` with the leapfrog
+        (Boris) scheme, in the uniform electric and magnetic fields `E` and
+        `B` (3-tuples, default none) acting on each particle's charge and
+        mass.  Particles with zero mass move in straight lines.
+
+        Each particle is advanced through all the steps with the GIL
+        released, in parallel over the particles on `num_threads` threads if
+        the extension was built with OpenMP.
+
+        If `every` is positive, the positions after every `every` steps are
+        recorded in `snapshots`, an (n_steps // every, 3, n) float32 array
+        that is allocated if not given, and returned.
+        '''
+        cdef:
+            float ex, ey, ez, bx, by, bz
+            bint fields = E is not None or B is not None
+            Py_ssize_t b, n = self.n
+            float *table
+            float *snaps = NULL
+            float[:, :, ::1] snap_view
+        ex, ey, ez = E if E is not None else (0, 0, 0)
+        bx, by, bz = B if B is not None else (0, 0, 0)
+        if every > 0:
+            snapshots = self._out(snapshots, (n_steps // every, _LEN, n))
+            snap_view = snapshots
+            if n_steps >= every and n:
+                snaps = &snap_view[0, 0, 0]
+        if not n:
+            return snapshots
+        table = &self.cols[0, 0]
+        with nogil:
+            for b in prange((n + BLOCK - 1) // BLOCK,
+                            num_threads=num_threads):
+                push(table, n, b * BLOCK, min(b * BLOCK + BLOCK, n),
+                     dt, n_steps, fields, ex, ey, ez, bx, by, bz,
+                     snaps, every)
+        return snapshots
+
+@cython.cdivision(True)
+cdef void push(float *table, Py_ssize_t n, Py_ssize_t i0, Py_ssize_t i1,
+               float dt, Py_ssize_t n_steps, bint fields,
+               float ex, float ey, float ez, float bx, float by, float bz,
+               float *snaps, Py_ssize_t every) noexcept nogil:
+    # Advances particles `i0` to `i1` (at most BLOCK) of the (8, n) `table`
+    # by `n_steps` steps of the Boris scheme: half an electric kick, a
+    # rotation about B, another half kick, then a drift.  Without fields,
+    # only the drift.
+    #
+    # The block of particles is advanced in lock-step, so that the C compiler
+    # can overlap (and vectorize) the independent updates of the particles,
+    # rather than waiting on each particle's chain of dependent steps.
+    cdef:
+        float x[BLOCK]
+        float y[BLOCK]
+        float z[BLOCK]
+        float vx[BLOCK]
+        float vy[BLOCK]
+        float vz[BLOCK]
+        float kx[BLOCK]
+        float ky[BLOCK]
+        float kz[BLOCK]
+        float tx[BLOCK]
+        float ty[BLOCK]
+        float tz[BLOCK]
+        float sx[BLOCK]
+        float sy[BLOCK]
+        float sz[BLOCK]
+        float h, f, ux, uy, uz, mass
+        Py_ssize_t j, s, m = i1 - i0, snap = 0, until_snap = every
+
+    for j in range(m):
+        x[j] = table[X * n + i0 + j]
+        y[j] = table[(X + 1) * n + i0 + j]
+        z[j] = table[(X + 2) * n + i0 + j]
+        vx[j] = table[VX * n + i0 + j]
+        vy[j] = table[(VX + 1) * n + i0 + j]
+        vz[j] = table[(VX + 2) * n + i0 + j]
+        mass = table[MASS * n + i0 + j]
+        # No force on particles without mass.
+        h = table[CHARGE * n + i0 + j] / mass * dt / 2 if mass != 0 else 0
+        kx[j], ky[j], kz[j] = h * ex, h * ey, h * ez
+        tx[j], ty[j], tz[j] = h * bx, h * by, h * bz
+        f = 2 / (1 + tx[j] * tx[j] + ty[j] * ty[j] + tz[j] * tz[j])
+        sx[j], sy[j], sz[j] = f * tx[j], f * ty[j], f * tz[j]
+
+    for s in range(n_steps):
+        if fields:
+            for j in range(m):
+                vx[j] += kx[j]
+                vy[j] += ky[j]
+                vz[j] += kz[j]
+                ux = vx[j] + (vy[j] * tz[j] - vz[j] * ty[j])
+                uy = vy[j] + (vz[j] * tx[j] - vx[j] * tz[j])
+                uz = vz[j] + (vx[j] * ty[j] - vy[j] * tx[j])
+                vx[j] += uy * sz[j] - uz * sy[j] + kx[j]
+                vy[j] += uz * sx[j] - ux * sz[j] + ky[j]
+                vz[j] += ux * sy[j] - uy * sx[j] + kz[j]
+        for j in range(m):
+            x[j] += vx[j] * dt
+            y[j] += vy[j] * dt
+            z[j] += vz[j] * dt
+        if snaps != NULL:
+            until_snap -= 1
+            if until_snap == 0:
+                for j in range(m):
+                    snaps[(snap * _LEN) * n + i0 + j] = x[j]
+                    snaps[(snap * _LEN + 1) * n + i0 + j] = y[j]
+                    snaps[(snap * _LEN + 2) * n + i0 + j] = z[j]
+                snap += 1
+                until_snap = every
+
+    for j in range(m):
+        table[X * n + i0 + j] = x[j]
+        table[(X + 1) * n + i0 + j] = y[j]
+        table[(X + 2) * n + i0 + j] = z[j]
+        table[VX * n + i0 + j] = vx[j]
+        table[(VX + 1) * n + i0 + j] = vy[j]
+        table[(VX + 2) * n + i0 + j] = vz[j]
+
+cdef class ParticleProxy:
+    '''
+    Particle `index` of a `ParticleArray`, with the same attributes as a
+    `Particle`; reads and writes go to the array.
+    '''
+
+    cdef:
+        readonly ParticleArray array
+        readonly Py_ssize_t index
+
+    def __init__(self, ParticleArray array, Py_ssize_t index):
+        self.array = array
+        self.index = index
+
+    property position:
+
+        def __get__(self):
+            return tuple(self.array.cols[X + k, self.index]
+                         for k in range(_LEN))
+
+        def __set__(self, it):
+            for k in range(_LEN):
+                self.array.cols[X + k, self.index] = it[k]
+
+    property velocity:
+
+        def __get__(self):
+            return tuple(self.array.cols[VX + k, self.index]
+                         for k in range(_LEN))
+
+        def __set__(self, it):
+            for k in range(_LEN):
+                self.array.cols[VX + k, self.index] = it[k]
+
+    property mass:
+
+        def __get__(self):
+            return self.array.cols[MASS, self.index]
+
+        def __set__(self, float mass):
+            self.array.cols[MASS, self.index] = mass
+
+    property charge:
+
+        def __get__(self):
+            return self.array.cols[CHARGE, self.index]
+
+        def __set__(self, float charge):
+            self.array.cols[CHARGE, self.index] = charge
+
+    property momentum:
+
+        "Particle object's momentum."
+
+        def __get__(self):
+            return tuple(v * self.mass for v in self.velocity)
+
+    property speed:
+
+        def __get__(self):
+            return sqrt(sum(v * v for v in self.velocity))
+
+    property direction:
+
+        def __get__(self):
+            cdef float spd = self.speed
+            return tuple(v / spd for v in self.velocity)
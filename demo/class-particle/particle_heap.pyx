@@ -1,17 +1,88 @@
 # from cython.view import array as cvarray
 cimport cython
-from libc.stdlib cimport malloc, free
+from libc.stdlib cimport malloc, realloc, free
 from libc.math cimport sqrt
 
 DEF _LEN = 3
 
+# --- The block pool ----------------------------------------------------------
+# In pooled mode (see `use_pool`), a particle's position and velocity share
+# one block, handed out from chunks of CHUNK_BLOCKS contiguous blocks.  Freed
+# blocks go onto a free list, linked through the blocks themselves, and are
+# reused before a new chunk is allocated.  Chunks are kept for the life of
+# the process.
+DEF CHUNK_BLOCKS = 1024
+
+cdef union Block:
+    Block *next
+    float data[2 * _LEN]
+
+cdef:
+    bint pooled = False
+    Block *free_list = NULL
+    Block **chunks = NULL
+    Py_ssize_t nchunks = 0, live = 0, high_water = 0
+
+cdef Block *pool_alloc() except NULL:
+    global free_list, chunks, nchunks, live, high_water
+    cdef Block *chunk
+    cdef Block **grown
+    cdef Py_ssize_t i
+    if free_list == NULL:
+        chunk = <Block*>malloc(CHUNK_BLOCKS * sizeof(Block))
+        grown = <Block**>realloc(chunks, (nchunks + 1) * sizeof(Block*))
+        if not chunk or not grown:
+            free(chunk)
+            raise MemoryError("Cannot allocate memory.")
+        chunks = grown
+        chunks[nchunks] = chunk
+        nchunks += 1
+        for i in range(CHUNK_BLOCKS - 1):
+            chunk[i].next = &chunk[i + 1]
+        chunk[CHUNK_BLOCKS - 1].next = NULL
+        free_list = chunk
+    cdef Block *block = free_list
+    free_list = block.next
+    live += 1
+    high_water = max(high_water, live)
+    return block
+
+cdef void pool_free(Block *block):
+    global free_list, live
+    block.next = free_list
+    free_list = block
+    live -= 1
+
+def use_pool(flag=True):
+    '''
+    Allocate the position and velocity of the Particles created from now on
+    from the block pool if `flag` is true, or with malloc otherwise.
+    '''
+    global pooled
+    pooled = flag
+
+def pool_stats():
+    '''
+    Returns a dict with the number of 'live' blocks in use, the number of
+    'chunks' allocated, and the 'high_water' mark of live blocks.
+    '''
+    return dict(live=live, chunks=nchunks, high_water=high_water,
+                block_size=sizeof(Block), chunk_blocks=CHUNK_BLOCKS)
+
 cdef class Particle:
 
     cdef:
         float *psn, *vel
+        Block *block
         public float mass, charge
 
     def __cinit__(self):
+        if pooled:
+            # take one block for both arrays from the pool.
+            self.block = pool_alloc()
+            self.psn = self.block.data
+            self.vel = self.block.data + _LEN
+            return
         # allocate the psn and vel arrays on the heap.
         self.psn = <float*>malloc(_LEN * sizeof(float))
         self.vel = <float*>malloc(_LEN * sizeof(float))
@@ -30,11 +101,16 @@ cdef class Particle:
         self.charge = charge
 
     def __dealloc__(self):
-        # called when cleaning up the object; free malloc'd memory.
+        # called when cleaning up the object; free malloc'd memory, or
+        # return the block to the pool.
+        if self.block:
+            pool_free(self.block); self.block = NULL
+            self.psn = self.vel = NULL
+            return
         if self.psn:
-            free(self.psn); self.psn == NULL
+            free(self.psn); self.psn = NULL
         if self.vel:
-            free(self.vel); self.vel == NULL
+            free(self.vel); self.vel = NULL
 
     property position:
 
@@ -6,12 +6,29 @@
 # Date: 26 March 2012
 #-----------------------------------------------------------------------------
 
+import os
+import sys
+
 from distutils.core import setup
 from distutils.extension import Extension
 from Cython.Distutils import build_ext
 
-exts = [Extension("particle", ["particle.pyx"]),
-        Extension("particle_heap", ["particle_heap.pyx"])]
+def openmp_args():
+    ''' The compiler (and linker) flag that enables OpenMP.  Set the
+    environment variable PARTICLE_NO_OPENMP if the compiler lacks OpenMP;
+    `ParticleArray.step` then runs serially.
+    '''
+    if os.environ.get('PARTICLE_NO_OPENMP'):
+        return []
+    return ['/openmp'] if sys.platform == 'win32' else ['-fopenmp']
+
+extra_args = openmp_args()
+
+exts = [Extension("particle", ["particle.pyx"],
+                  extra_compile_args=extra_args,
+                  extra_link_args=extra_args),
+        Extension("particle_heap", ["particle_heap.pyx"]),
+        Extension("celllist", ["celllist.pyx"])]
 
 setup(
     cmdclass = {'build_ext': build_ext},
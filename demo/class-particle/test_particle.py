@@ -11,3 +11,94 @@ assert(p.speed == 5)
 
 p.mass = 2.0
 assert(p.momentum == (6,8,0))
+
+from particle import ParticleArray
+import numpy as np
+
+pa = ParticleArray.from_particles([p, Particle(vel=[0, 0, 2], mass=1.0)])
+assert(len(pa) == 2)
+assert(pa[0].momentum == p.momentum)
+assert(pa[-1].speed == 2)
+assert(np.all(pa.speed() == [5, 2]))
+assert(np.all(pa.momentum()[:, 0] == p.momentum))
+assert(np.all(pa.direction()[:, 1] == [0, 0, 1]))
+assert(abs(pa.rms_speed() - np.sqrt((25 + 4) / 2.0)) < 1e-6)
+
+# Proxies and buffers are views on the same columns.
+pa[1].mass = 3.0
+assert(pa.mass[1] == 3.0)
+table = np.asarray(pa)
+assert(table.shape == (8, 2))
+table[0, 0] = 7.0
+assert(pa[0].position[0] == 7.0 and pa.x[0] == 7.0)
+# The table is never replaced, so exported buffers stay valid.
+pa.__init__(1000)
+assert(len(pa) == 2 and np.shares_memory(table, pa.table))
+
+import particle_heap
+
+particle_heap.use_pool(True)
+heap_particles = [particle_heap.Particle(vel=[3, 4, 0], mass=2.0)
+                  for _ in range(1500)]
+stats = particle_heap.pool_stats()
+assert(stats['live'] == 1500 and stats['chunks'] == 2)
+assert(heap_particles[-1].momentum == (6, 8, 0))
+del heap_particles
+# Freed blocks are reused before new chunks are allocated.
+heap_particles = [particle_heap.Particle() for _ in range(1500)]
+assert(particle_heap.pool_stats()['chunks'] == 2)
+del heap_particles
+assert(particle_heap.pool_stats()['live'] == 0)
+assert(particle_heap.pool_stats()['high_water'] == 1500)
+particle_heap.use_pool(False)
+
+# Time stepping: free streaming, a constant electric field, and a full
+# gyration about a magnetic field.
+pa = ParticleArray.from_particles([Particle(vel=[1, 0, 0])] * 3)
+pa.step(0.5, 4)
+assert(np.allclose(pa.x, 2.0))
+
+pa = ParticleArray.from_particles([Particle(mass=2.0, charge=1.0)])
+pa.step(0.01, 100, E=(1, 0, 0))
+assert(np.allclose(pa.velocity[:, 0], (0.5, 0, 0), atol=1e-5))
+
+pa = ParticleArray.from_particles([Particle(vel=[1, 0, 0], mass=1.0,
+                                            charge=1.0)] * 20)
+steps = 1000
+snapshots = pa.step(2 * np.pi / steps, steps, B=(0, 0, 1), every=10)
+assert(snapshots.shape == (100, 3, 20))
+assert(np.allclose(pa.position, 0, atol=1e-3))
+assert(np.allclose(pa.speed(), 1))
+# (Leapfrog offsets the orbit's centre by about dt / 2.)
+radii = np.hypot(snapshots[:, 0], snapshots[:, 1] + 1)
+assert(np.allclose(radii, 1, atol=np.pi / steps))
+
+# Neighbour queries with a cell list agree with brute force.
+from celllist import CellList
+
+rng = np.random.RandomState(0)
+pa = ParticleArray(500)
+pa.position[:] = rng.uniform(0, 5, (3, 500))
+cells = CellList(pa.position, 0.5, skin=0.2)
+psn = pa.position.T.astype(np.float64)
+close = ((psn[:, np.newaxis] - psn[np.newaxis]) ** 2).sum(-1) <= 0.25
+expected = set(zip(*np.nonzero(np.triu(close, 1))))
+assert(set(map(tuple, cells.pairs().tolist())) == expected)
+out = np.empty((5, 2), dtype=np.int32)
+assert(cells.pairs(out) == len(expected))
+assert(np.all(cells.query_radius(psn[0], 0.5) == np.nonzero(close[0])[0]))
+
+# Small moves keep the cells; larger ones rebuild them.
+pa.position[:] += 0.05
+assert(not cells.update())
+assert(set(map(tuple, cells.pairs().tolist())) == expected)
+pa.position[0, 0] += 0.2
+assert(cells.update() and cells.rebuilds == 2)
+
+# The positions are tracked in place, so a copy is refused.
+try:
+    CellList(pa.position.astype(np.float64), 0.5)
+except ValueError:
+    pass
+else:
+    assert False, "float64 positions should raise ValueError"
@@ -1,7 +1,15 @@
+from multiprocessing import Pool
+
 import numpy as np
 from numpy import exp, sin, pi
 from numpy.random import uniform
 
+# The compiled evaluator, if it has been built with `make`.
+try:
+    from harmonograph_cython import xyt as xyt_compiled
+except ImportError:
+    xyt_compiled = None
+
 def random_frequencies():
     fs = [uniform(10,10.5) for _ in range(4)]
     fs[1] = fs[3]
@@ -14,12 +22,20 @@ def random_phases():
 def random_decay():
     return [uniform(0.025, .03) for _ in range(4)]
 
-def compute(t, amps=None, fs=None, phs=None, ds=None):
+def compute(t, amps=None, fs=None, phs=None, ds=None, out=None,
+            compiled=True):
+    """
+    The (x, y) curve at times `t`.  Uses the compiled evaluator if it is
+    built and `compiled` is true, writing to the (2, len(t)) array `out` if
+    given; otherwise, `xyt`.
+    """
     amps = amps or [1.0] * 4
     fs = fs or random_frequencies()
     phs = phs or random_phases()
     ds = ds or random_decay()
     args = amps + ds + fs + phs + [t]
+    if compiled and xyt_compiled is not None:
+        return xyt_compiled(*args, out=out)
     return xyt(*args)
 
 def dosc(a, d, f, p, t):
@@ -36,18 +52,69 @@ def xyt(ax1, ax2, ay1, ay2, dx1, dx2, dy1, dy2, fx1, fx2, fy1, fy2, px1, px2, py
     y = dosc(ay1, dy1, fy1, py1, t) + dosc(ay2, dy2, fy2, py2, t)
     return x, y
 
-def main(N):
+T = np.linspace(0, 40, 5000)
+
+def random_params():
+    return [1.0] * 4 + random_decay() + random_frequencies() + random_phases()
+
+def frame(params):
+    """ The (x, y) curve of a harmonograph with parameters `params`. """
+    if xyt_compiled is not None:
+        return xyt_compiled(*(params + [T]))
+    return np.array(xyt(*(params + [T])))
+
+def save_png(xy, fname):
     import matplotlib
-    matplotlib.use('MacOSX')
+    matplotlib.use('Agg')
     from matplotlib import pyplot as plt
-    t = np.linspace(0, 40, 5000)
-    for _ in range(N):
-        x, y = compute(t)
-        fname = 'harmonograph_{:03d}.png'.format(_)
-        plt.plot(x, y)
-        plt.savefig(fname)
-        plt.clf()
-        
+    plt.plot(*xy)
+    plt.savefig(fname)
+    plt.close('all')
+
+def write_curves(params, filename):
+    """ Computes `frame(p)` for each `p` in `params` in worker processes,
+    writing the curves in order to the memory-mapped .npy stack `filename`,
+    so they need not all fit in memory.
+    """
+    curves = np.lib.format.open_memmap(filename, mode='w+',
+                                       shape=(len(params), 2, len(T)))
+    pool = Pool()
+    try:
+        for i, curve in enumerate(pool.imap(frame, params)):
+            curves[i] = curve
+    finally:
+        pool.close()
+        pool.join()
+    curves.flush()
+
+def _plot_curve(args):
+    filename, index, fname = args
+    save_png(np.load(filename, mmap_mode='r')[index], fname)
+
+def plot_curves(filename, fnames):
+    """ Plots each curve in the .npy stack `filename` to the corresponding
+    PNG file in `fnames`, in worker processes.
+    """
+    pool = Pool()
+    try:
+        pool.map(_plot_curve, [(filename, i, fname)
+                               for i, fname in enumerate(fnames)])
+    finally:
+        pool.close()
+        pool.join()
+
+def main(N, filename='harmonograph.npy', png=True):
+    """ Computes `N` random harmonographs in worker processes, streaming the
+    curves to the .npy stack `filename`, then (if `png`) plots each one to a
+    PNG file.
+    """
+    # Draw the parameters here: forked workers would share a random state.
+    params = [random_params() for _ in range(N)]
+    write_curves(params, filename)
+    if png:
+        plot_curves(filename,
+                    ['harmonograph_{:03d}.png'.format(_) for _ in range(N)])
+
 if __name__ == '__main__':
     main(10)
 
@@ -0,0 +1,116 @@
+'''
+The harmonograph curve in one pass over `t`, with no temporary arrays.
+
+Each damped oscillator a * exp(-d*t) * sin(f*t + p) is the imaginary part
+of the phasor z(t) = a * exp((-d + i*f) * t + i*p).  When `t` is evenly
+spaced by dt, z(t + dt) = z(t) * exp((-d + i*f) * dt), so each sample costs
+a complex multiply instead of an `exp` and a `sin`.  The phasors are
+recomputed exactly every RESEED samples, which keeps the rounding error of
+the recurrence near 1e-14.
+'''
+
+cimport cython
+from libc.math cimport exp, sin, cos, fabs
+import numpy as np
+
+DEF NOSC = 4
+DEF RESEED = 256
+
+cdef struct Oscillator:
+    double a, d, f, p
+
+cdef inline void seed(Oscillator *osc, double t, double *re,
+                      double *im) noexcept nogil:
+    cdef double mag = osc.a * exp(-osc.d * t)
+    re[0] = mag * cos(osc.f * t + osc.p)
+    im[0] = mag * sin(osc.f * t + osc.p)
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef bint evenly_spaced(double[::1] t) noexcept nogil:
+    # Whether t[i] == t[0] + i * dt, to within rounding.
+    cdef:
+        Py_ssize_t i, n = t.shape[0]
+        double dt, tol
+    if n < 3:
+        return True
+    dt = (t[n - 1] - t[0]) / (n - 1)
+    tol = 1e-12 * max(max(fabs(t[0]), fabs(t[n - 1])), 1.0)
+    for i in range(n):
+        if fabs(t[i] - (t[0] + i * dt)) > tol:
+            return False
+    return True
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+cdef void recurrence(Oscillator *oscs, double[::1] t, double[::1] x,
+                     double[::1] y) noexcept nogil:
+    cdef:
+        Py_ssize_t i, n = t.shape[0]
+        int k
+        double dt = (t[n - 1] - t[0]) / (n - 1) if n > 1 else 0.0
+        double re[NOSC]
+        double im[NOSC]
+        double step_re[NOSC]
+        double step_im[NOSC]
+        double mag, tmp
+    for k in range(NOSC):
+        mag = exp(-oscs[k].d * dt)
+        step_re[k] = mag * cos(oscs[k].f * dt)
+        step_im[k] = mag * sin(oscs[k].f * dt)
+    for i in range(n):
+        if i % RESEED == 0:
+            for k in range(NOSC):
+                seed(&oscs[k], t[0] + i * dt, &re[k], &im[k])
+        x[i] = im[0] + im[1]
+        y[i] = im[2] + im[3]
+        for k in range(NOSC):
+            tmp = re[k] * step_re[k] - im[k] * step_im[k]
+            im[k] = re[k] * step_im[k] + im[k] * step_re[k]
+            re[k] = tmp
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef void direct(Oscillator *oscs, double[::1] t, double[::1] x,
+                 double[::1] y) noexcept nogil:
+    cdef:
+        Py_ssize_t i
+        int k
+        double v[NOSC]
+    for i in range(t.shape[0]):
+        for k in range(NOSC):
+            v[k] = oscs[k].a * exp(-oscs[k].d * t[i]) * \
+                   sin(oscs[k].f * t[i] + oscs[k].p)
+        x[i] = v[0] + v[1]
+        y[i] = v[2] + v[3]
+
+def xyt(ax1, ax2, ay1, ay2, dx1, dx2, dy1, dy2, fx1, fx2, fy1, fy2,
+        px1, px2, py1, py2, t, out=None, recurrence_ok=True):
+    '''
+    The same as `harmonograph.xyt`, but returns a (2, len(t)) array of the x
+    and y coordinates, written to `out` if given.
+
+    If `t` is evenly spaced (as from `np.linspace`) and `recurrence_ok`, the
+    oscillators are stepped with the phasor recurrence; otherwise `exp` and
+    `sin` are evaluated at every sample.
+    '''
+    cdef Oscillator oscs[NOSC]
+    params = [(ax1, dx1, fx1, px1), (ax2, dx2, fx2, px2),
+              (ay1, dy1, fy1, py1), (ay2, dy2, fy2, py2)]
+    for k, (a, d, f, p) in enumerate(params):
+        oscs[k].a, oscs[k].d, oscs[k].f, oscs[k].p = a, d, f, p
+
+    cdef double[::1] tv = np.ascontiguousarray(t, dtype=np.float64)
+    if out is None:
+        out = np.empty((2, tv.shape[0]))
+    elif out.shape != (2, tv.shape[0]):
+        raise ValueError("out must have shape (2, %d)" % tv.shape[0])
+    cdef double[:, ::1] xy = out
+    cdef bint use_recurrence = recurrence_ok
+    with nogil:
+        if use_recurrence and evenly_spaced(tv):
+            recurrence(oscs, tv, xy[0], xy[1])
+        else:
+            direct(oscs, tv, xy[0], xy[1])
+    return out
@@ -3,12 +3,12 @@ from time import time as clock_time
 
 import numpy as np
 
-from traits.api import HasTraits, Float, Instance, Array, on_trait_change, DelegatesTo, Property
+from traits.api import HasTraits, Float, Instance, Array, on_trait_change, DelegatesTo, Property, Bool, Int, Any
 from traitsui.api import View, Item, RangeEditor, HGroup
 from chaco.api import Plot, ArrayPlotData
 from enable.api import ComponentEditor
 
-from harmonograph import compute
+from harmonograph import compute, xyt_compiled
 
 # --- Traits classes.
 
@@ -34,11 +34,18 @@ class Harmonograph(HasTraits):
 
     runtime = Float()
     time = Array()
-    xy = Property(depends_on=['time, ' + depon])
+    # Use the compiled evaluator, if it is built.
+    compiled = Bool(xyt_compiled is not None)
+    xy = Property(depends_on=['time, compiled, ' + depon])
     osc0 = Instance(Oscillator, args=())
     osc1 = Instance(Oscillator, args=())
     osc2 = Instance(Oscillator, args=())
     osc3 = Instance(Oscillator, args=())
+
+    # Two (2, len(time)) buffers for the compiled evaluator, used in turn so
+    # that a new curve is never written into the arrays being plotted.
+    _buffers = Any()
+    _front = Int(0)
     
     def _time_default(self):
         return np.linspace(0, 10, 1000)
@@ -53,12 +60,22 @@ class Harmonograph(HasTraits):
         fs = [o.freq for o in oscs]
         phs = [o.phase for o in oscs]
         ds = [o.damping for o in oscs]
-        xy = compute(self.time, amps, fs, phs, ds)
+        xy = compute(self.time, amps, fs, phs, ds, out=self._next_buffer(),
+                     compiled=self.compiled)
         t1 = clock_time() - t0
         self.runtime = t1
         return xy
+
+    def _next_buffer(self):
+        if not self.compiled:
+            return None
+        shape = (2, len(self.time))
+        if self._buffers is None or self._buffers[0].shape != shape:
+            self._buffers = [np.empty(shape), np.empty(shape)]
+        self._front = 1 - self._front
+        return self._buffers[self._front]
     
-    @on_trait_change(depon)
+    @on_trait_change('compiled, ' + depon)
     def update(self):
         self.xy = self.compute()
 
@@ -75,6 +92,7 @@ class HarmonographUI(HasTraits):
     osc1 = DelegatesTo('model')
     osc2 = DelegatesTo('model')
     osc3 = DelegatesTo('model')
+    compiled = DelegatesTo('model')
     plot = Instance(Plot)
     totaltime = Float(20.)
     starttime = Float(0.0)
@@ -88,13 +106,19 @@ class HarmonographUI(HasTraits):
                 Item('osc2', style='custom', show_label=False),
                 Item('osc3', style='custom', show_label=False),
                 ),
-            Item('framerate', style='readonly'),
+            HGroup(
+                Item('framerate', style='readonly'),
+                Item('compiled', enabled_when='object.can_compile'),
+                ),
             width=800,
             height=600,
             resizable=True)
     
+    can_compile = Bool(xyt_compiled is not None)
+
     def _get_framerate(self):
-        return "{:d} FPS".format(int(1. / (self.model.runtime)))
+        fps = int(1. / max(self.model.runtime, 1e-6))
+        return "{:d} FPS ({})".format(fps, "Cython" if self.compiled else "NumPy")
     
     @on_trait_change('starttime, totaltime')
     def update(self):
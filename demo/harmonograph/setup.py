@@ -0,0 +1,10 @@
+from distutils.core import setup
+from distutils.extension import Extension
+from Cython.Distutils import build_ext
+
+exts = [Extension("harmonograph_cython", ["harmonograph_cython.pyx"])]
+
+setup(
+    cmdclass = {'build_ext': build_ext},
+    ext_modules = exts,
+)
@@ -0,0 +1,23 @@
+import numpy as np
+
+import harmonograph as hg
+from harmonograph_cython import xyt
+
+params = hg.random_params()
+
+# Evenly spaced times use the phasor recurrence; others, exp and sin.
+for t in (hg.T, np.linspace(5, 55, 100000),
+          np.sort(np.random.uniform(0, 40, 1000))):
+    expected = np.array(hg.xyt(*(params + [t])))
+    assert np.allclose(xyt(*(params + [t])), expected, rtol=0, atol=1e-12)
+    assert np.allclose(xyt(*(params + [t]), recurrence_ok=False), expected,
+                       rtol=0, atol=1e-15)
+
+out = np.empty((2, len(hg.T)))
+assert hg.compute(hg.T, out=out) is out
+try:
+    xyt(*(params + [hg.T]), out=np.empty((2, 10)))
+except ValueError:
+    pass
+else:
+    assert False, "out of the wrong shape should raise ValueError"
@@ -0,0 +1,42 @@
+'''
+bench_rms_speeds.py
+
+Times the per-call overhead of `wrap_particle_tmpl.rms_speeds` for small
+numbers of particles, where the work in C++ is negligible: on a list of
+`Particle` objects, on an (n, 8) array used in place, and the same
+computation written with NumPy for comparison.
+
+    $ python setup.py build_ext --inplace && python bench_rms_speeds.py
+'''
+
+from __future__ import print_function
+
+import timeit
+
+import numpy as np
+
+import wrap_particle_tmpl as wpt
+
+def numpy_rms_speeds(table):
+    return np.sqrt((table[:, 3:6] ** 2).sum(axis=1).mean())
+
+def per_call(func, arg, number=20000, repeat=5):
+    ''' The best time of a call to `func(arg)`, in microseconds. '''
+    return 1e6 * min(timeit.repeat(lambda: func(arg), number=number,
+                                   repeat=repeat)) / number
+
+def bench(dtype, sizes=(1, 4, 16, 64)):
+    print("{}:".format(np.dtype(dtype).name))
+    print("    {:>4s} {:>10s} {:>10s} {:>10s}".format(
+          "n", "list", "array", "numpy"))
+    for n in sizes:
+        table = np.random.rand(n, len(wpt.FIELDS)).astype(dtype)
+        particles = [wpt.Particle(*row, dtype=dtype) for row in table]
+        print("    {:4d} {:8.2f}us {:8.2f}us {:8.2f}us".format(
+              n, per_call(wpt.rms_speeds, particles),
+              per_call(wpt.rms_speeds, table),
+              per_call(numpy_rms_speeds, table)))
+
+if __name__ == '__main__':
+    for dtype in (np.float32, np.float64, np.longdouble):
+        bench(dtype)
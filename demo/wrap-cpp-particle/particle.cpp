@@ -1,13 +1,120 @@
 #include "particle.h"
+#include <algorithm>
+#include <limits>
 #include <vector>
 
+// The reductions sum the particles in fixed-size chunks, in parallel with
+// OpenMP, and then add up the chunks' partial sums in order.  The result
+// therefore does not depend on the number of threads.  The sums are kept in
+// double, so single-precision rounding does not build up over millions of
+// particles.
+static const std::ptrdiff_t CHUNK = 4096;
+
+static std::ptrdiff_t num_chunks(std::size_t n)
+{
+    return (n + CHUNK - 1) / CHUNK;
+}
+
 float rms_speeds(std::vector<const Particle*> *particles)
 {
-    float sum_speeds_sq = 0;
+    double sum_speeds_sq = 0;
     typedef std::vector<const Particle*>::const_iterator ParticleIter;
     
     for (ParticleIter it=particles->begin(); it != particles->end(); ++it) {
-        sum_speeds_sq += (*it)->get_speed() * (*it)->get_speed();
+        sum_speeds_sq += (*it)->get_speed_sq();
     }
     return sqrt(sum_speeds_sq / particles->size());
 }
+
+float rms_speeds(const std::vector<Particle> *particles)
+{
+    if (particles->empty())
+        return NAN;
+    return sqrt(sum_speeds_sq(&(*particles)[0], particles->size()) /
+                particles->size());
+}
+
+double sum_speeds_sq(const Particle *particles, std::size_t n)
+{
+    const std::ptrdiff_t nchunks = num_chunks(n);
+    std::vector<double> partials(nchunks);
+
+    #pragma omp parallel for schedule(static)
+    for (std::ptrdiff_t c = 0; c < nchunks; ++c) {
+        const std::size_t end = std::min<std::size_t>(n, (c + 1) * CHUNK);
+        double sum = 0;
+        for (std::size_t i = c * CHUNK; i < end; ++i) {
+            sum += particles[i].get_speed_sq();
+        }
+        partials[c] = sum;
+    }
+
+    double total = 0;
+    for (std::ptrdiff_t c = 0; c < nchunks; ++c) {
+        total += partials[c];
+    }
+    return total;
+}
+
+namespace {
+
+struct Partial
+{
+    double speed_sq, energy, momentum[3], position[3];
+    float min_speed_sq, max_speed_sq;
+};
+
+}
+
+void particle_stats(const Particle *particles, std::size_t n,
+                    ParticleStats *stats)
+{
+    const std::ptrdiff_t nchunks = num_chunks(n);
+    std::vector<Partial> partials(nchunks);
+
+    #pragma omp parallel for schedule(static)
+    for (std::ptrdiff_t c = 0; c < nchunks; ++c) {
+        const std::size_t end = std::min<std::size_t>(n, (c + 1) * CHUNK);
+        Partial s = {0, 0, {0, 0, 0}, {0, 0, 0},
+                     std::numeric_limits<float>::infinity(), 0};
+        for (std::size_t i = c * CHUNK; i < end; ++i) {
+            const Particle &p = particles[i];
+            const float v2 = p.get_speed_sq();
+            s.speed_sq += v2;
+            s.energy += 0.5 * p.get_mass() * v2;
+            s.momentum[0] += p.get_mass() * p.get_vx();
+            s.momentum[1] += p.get_mass() * p.get_vy();
+            s.momentum[2] += p.get_mass() * p.get_vz();
+            s.position[0] += p.get_x();
+            s.position[1] += p.get_y();
+            s.position[2] += p.get_z();
+            s.min_speed_sq = std::min(s.min_speed_sq, v2);
+            s.max_speed_sq = std::max(s.max_speed_sq, v2);
+        }
+        partials[c] = s;
+    }
+
+    Partial total = {0, 0, {0, 0, 0}, {0, 0, 0},
+                     std::numeric_limits<float>::infinity(), 0};
+    for (std::ptrdiff_t c = 0; c < nchunks; ++c) {
+        const Partial &s = partials[c];
+        total.speed_sq += s.speed_sq;
+        total.energy += s.energy;
+        for (int k = 0; k < 3; ++k) {
+            total.momentum[k] += s.momentum[k];
+            total.position[k] += s.position[k];
+        }
+        total.min_speed_sq = std::min(total.min_speed_sq, s.min_speed_sq);
+        total.max_speed_sq = std::max(total.max_speed_sq, s.max_speed_sq);
+    }
+
+    stats->count = n;
+    stats->rms_speed = n ? sqrt(total.speed_sq / n) : NAN;
+    stats->kinetic_energy = total.energy;
+    for (int k = 0; k < 3; ++k) {
+        stats->momentum[k] = total.momentum[k];
+        stats->centroid[k] = n ? total.position[k] / n : NAN;
+    }
+    stats->min_speed = n ? sqrt(total.min_speed_sq) : NAN;
+    stats->max_speed = n ? sqrt(total.max_speed_sq) : NAN;
+}
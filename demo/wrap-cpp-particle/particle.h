@@ -2,6 +2,7 @@
 #define _PARTICLE_H_
 
 #include <cmath>
+#include <cstddef>
 #include <vector>
 
     template<typename T>
@@ -29,10 +30,39 @@ class Particle
             return norm2(_vx, _vy, _vz);
         }
 
+        // The squared speed, without the sqrt.
+        const float get_speed_sq() const {
+            return _vx * _vx + _vy * _vy + _vz * _vz;
+        }
+
         const float& get_x() const {
             return _x;
         }
 
+        const float& get_y() const {
+            return _y;
+        }
+
+        const float& get_z() const {
+            return _z;
+        }
+
+        const float& get_vx() const {
+            return _vx;
+        }
+
+        const float& get_vy() const {
+            return _vy;
+        }
+
+        const float& get_vz() const {
+            return _vz;
+        }
+
+        const float& get_mass() const {
+            return _mass;
+        }
+
     private:
         float _x, _y, _z;
         float _vx, _vy, _vz;
@@ -41,5 +71,21 @@ class Particle
 };
 
 float rms_speeds(std::vector<const Particle*> *particles);
+float rms_speeds(const std::vector<Particle> *particles);
+
+// Reductions over n contiguous particles.
+struct ParticleStats
+{
+    std::size_t count;
+    double rms_speed;
+    double kinetic_energy;
+    double momentum[3];
+    double centroid[3];
+    float min_speed, max_speed;
+};
+
+double sum_speeds_sq(const Particle *particles, std::size_t n);
+void particle_stats(const Particle *particles, std::size_t n,
+                    ParticleStats *stats);
 
 #endif
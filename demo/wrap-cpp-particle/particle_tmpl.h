@@ -7,7 +7,7 @@
     template<typename T>
 inline const T norm2(const T x, const T y, const T z)
 {
-    return sqrt(x * x + y * y + z * z);
+    return std::sqrt(x * x + y * y + z * z);
 }
 
 template <typename T>
@@ -30,6 +30,11 @@ class Particle
             return norm2(_vx, _vy, _vz);
         }
 
+        // The squared speed, without the sqrt.
+        const T get_speed_sq() const {
+            return _vx * _vx + _vy * _vy + _vz * _vz;
+        }
+
         const T& get_x() const {
             return _x;
         }
@@ -48,9 +53,21 @@ T rms_speeds(std::vector<const Particle<T>*> *particles)
     typedef typename std::vector<const Particle<T> * >::const_iterator ParticleIter;
     
     for (ParticleIter it=particles->begin(); it != particles->end(); ++it) {
-        sum_speeds_sq += (*it)->get_speed() * (*it)->get_speed();
+        sum_speeds_sq += (*it)->get_speed_sq();
+    }
+    return std::sqrt(sum_speeds_sq / particles->size());
+}
+
+// The same, for `n` particles stored contiguously, e.g. viewed in place from
+// an (n, 8) array with one particle per row.
+template <typename T>
+T rms_speeds(const Particle<T> *particles, size_t n)
+{
+    T sum_speeds_sq = 0;
+    for (size_t i = 0; i < n; ++i) {
+        sum_speeds_sq += particles[i].get_speed_sq();
     }
-    return sqrt(sum_speeds_sq / particles->size());
+    return std::sqrt(sum_speeds_sq / n);
 }
 
 #endif
@@ -1,8 +1,26 @@
+import os
+import sys
+
 from distutils.core import setup
 from distutils.extension import Extension
 from Cython.Distutils import build_ext
 
-ext = Extension("wrap_particle", ["wrap_particle.pyx", "particle.cpp"], language="c++")
+def openmp_args():
+    ''' The compiler (and linker) flag that enables OpenMP.  Set the
+    environment variable PARTICLE_NO_OPENMP if the compiler lacks OpenMP;
+    the particle reductions then run serially.
+    '''
+    if os.environ.get('PARTICLE_NO_OPENMP'):
+        return []
+    return ['/openmp'] if sys.platform == 'win32' else ['-fopenmp']
+
+extra_args = openmp_args()
+
+ext = Extension("wrap_particle", ["wrap_particle.pyx", "particle.cpp"],
+                depends=["particle.h"],
+                extra_compile_args=extra_args,
+                extra_link_args=extra_args,
+                language="c++")
 
 setup(
     cmdclass = {'build_ext': build_ext},
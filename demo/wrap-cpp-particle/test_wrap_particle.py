@@ -18,3 +18,32 @@ print "subparticle.get_x():", subp.get_x()
 
 print wrap_particle.rms_speeds([p, p1])
 # print wrap_particle.rms_speeds([p, p1, 'foo'])
+
+# Bulk construction: no Python object per particle.
+data = np.zeros((3, 8), dtype=np.float32)
+data[:, 0] = [1, 2, 3]
+data[0, 3:5] = [3, 4]
+pv = wrap_particle.ParticleVector(data)
+assert len(pv) == 3
+assert np.all(pv.get_x() == [1, 2, 3])
+assert np.all(pv.get_speeds() == [5, 0, 0])
+assert np.allclose(wrap_particle.rms_speeds(pv), np.sqrt(25 / 3.0))
+
+# Calling __init__ again replaces the particles.
+pv2 = wrap_particle.ParticleVector(data)
+pv2.__init__(data[:2])
+assert len(pv2) == 2
+
+records = np.zeros(3, dtype=[(f, np.float64)
+                             for f in wrap_particle.ParticleVector.FIELDS])
+records['x'] = [1, 2, 3]
+assert np.all(wrap_particle.ParticleVector(records).get_x() == [1, 2, 3])
+
+data[:, 6] = 2.0
+stats = wrap_particle.ParticleVector(data).stats()
+assert stats['count'] == 3
+assert np.allclose(stats['kinetic_energy'], 25.0)
+assert np.allclose(stats['momentum'], (6, 8, 0))
+assert np.allclose(stats['centroid'], (2, 0, 0))
+assert (stats['min_speed'], stats['max_speed']) == (0, 5)
+assert np.allclose(stats['rms_speed'], pv.rms_speeds())
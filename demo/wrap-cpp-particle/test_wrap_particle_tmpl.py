@@ -0,0 +1,45 @@
+from __future__ import print_function
+
+import wrap_particle_tmpl as wpt
+import numpy as np
+
+assert np.allclose(wpt.norm2(1, 2, 3), np.sqrt(14.0))
+
+args = [1, 0, 0, 3, 4, 0, 1, 0]
+
+for dtype in 'fdg':
+    p = wpt.Particle(*args, dtype=dtype)
+    p1 = wpt.Particle(*[0] * 8, dtype=dtype)
+    assert p.dtype == np.dtype(dtype)
+    assert (p.get_x(), p.get_speed()) == (1, 5)
+    assert np.allclose(wpt.rms_speeds([p, p1]), np.sqrt(25 / 2.0))
+print("rms_speeds([p, p1]):", wpt.rms_speeds([p, p1]))
+
+# All the particles must have the same dtype.
+try:
+    wpt.rms_speeds([wpt.Particle(*args), wpt.Particle(*args, dtype='d')])
+except TypeError:
+    pass
+else:
+    assert False, "mixed dtypes should raise TypeError"
+
+# Bulk entry points: an (n, 8) array, one particle per row, used in place.
+for dtype in (np.float32, np.float64, np.longdouble):
+    table = np.zeros((3, len(wpt.FIELDS)), dtype=dtype)
+    table[0] = args
+    speeds = wpt.speeds(table)
+    assert speeds.dtype == dtype
+    assert np.all(speeds == [5, 0, 0])
+    assert np.allclose(wpt.rms_speeds(table), np.sqrt(25 / 3.0))
+
+# Long double keeps the precision that double loses, through every entry
+# point.
+vx = np.longdouble(1) + np.finfo(np.longdouble).eps
+table = np.zeros((1, 8), dtype=np.longdouble)
+table[0, 3] = vx
+assert wpt.speeds(table)[0] == vx
+assert wpt.rms_speeds(table) == vx
+p = wpt.Particle(vx, 0, 0, vx, 0, 0, 1, 0, dtype='g')
+assert p.get_x() == vx and p.get_speed() == vx
+assert wpt.rms_speeds([p]) == vx
+assert type(wpt.rms_speeds([p])) is np.longdouble
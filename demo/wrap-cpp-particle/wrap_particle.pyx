@@ -1,7 +1,9 @@
+cimport cython
 from libcpp.vector cimport vector
 from cython.operator cimport dereference as deref
+import numpy as np
 
-cdef extern from "particle.h":
+cdef extern from "particle.h" nogil:
     
     const float _norm2 "norm2"(float x, float y, float z)
 
@@ -14,6 +16,18 @@ cdef extern from "particle.h":
         const float get_x()
     
     float _rms_speeds "rms_speeds"(vector[const _Particle*] *particles)
+    float _rms_speeds "rms_speeds"(const vector[_Particle] *particles)
+
+    cdef struct ParticleStats:
+        size_t count
+        double rms_speed
+        double kinetic_energy
+        double momentum[3]
+        double centroid[3]
+        float min_speed, max_speed
+
+    void particle_stats(const _Particle *particles, size_t n,
+                        ParticleStats *stats)
         
 def norm2(float x, float y, float z):
     cdef float pn = _norm2(x, y, z)
@@ -34,6 +48,9 @@ cpdef float rms_speeds(particles) except *:
         vector[const _Particle *] vparticles
         _Particle *part
 
+    if isinstance(particles, ParticleVector):
+        return (<ParticleVector>particles).rms_speeds()
+
     for particle in particles:
         if not isinstance(particle, Particle):
             raise TypeError("object %r is not an instance of Particle." % particle)
@@ -42,6 +59,97 @@ cpdef float rms_speeds(particles) except *:
         
     return _rms_speeds(&vparticles)
 
+cdef class ParticleVector:
+    '''
+    A C++ vector of particles, built in one pass from an (n, 8) array of
+    x, y, z, vx, vy, vz, mass and charge, or a structured array with those
+    fields.
+
+    The particles are only accessible in bulk, through methods that loop
+    over the vector in C++, so no Python object is made per particle.
+    '''
+
+    FIELDS = ('x', 'y', 'z', 'vx', 'vy', 'vz', 'mass', 'charge')
+
+    cdef vector[_Particle] particles
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    def __init__(self, data):
+        data = np.asarray(data)
+        if data.dtype.names is not None:
+            data = np.column_stack([data[f] for f in self.FIELDS])
+        cdef float[:, ::1] cols = np.ascontiguousarray(data, dtype=np.float32)
+        if cols.shape[1] != 8:
+            raise ValueError("expected an (n, 8) array, got shape %r"
+                             % (data.shape,))
+        cdef Py_ssize_t i
+        with nogil:
+            # Replace, rather than add to, the particles if called again.
+            self.particles.clear()
+            self.particles.reserve(cols.shape[0])
+            for i in range(cols.shape[0]):
+                self.particles.push_back(
+                    _Particle(cols[i, 0], cols[i, 1], cols[i, 2],
+                              cols[i, 3], cols[i, 4], cols[i, 5],
+                              cols[i, 6], cols[i, 7]))
+
+    def __len__(self):
+        return self.particles.size()
+
+    cpdef float rms_speeds(self) except *:
+        with nogil:
+            return _rms_speeds(&self.particles)
+
+    def stats(self):
+        ''' Returns a dict of reductions over the particles: their
+        'rms_speed', 'min_speed' and 'max_speed', total 'kinetic_energy' and
+        'momentum', and 'centroid' (the mean position).
+
+        They are computed in parallel if the extension was built with
+        OpenMP, with the same result whatever the number of threads.
+        '''
+        cdef ParticleStats stats
+        cdef size_t n = self.particles.size()
+        with nogil:
+            particle_stats(&self.particles[0] if n else NULL, n, &stats)
+        return dict(count=stats.count,
+                    rms_speed=stats.rms_speed,
+                    min_speed=stats.min_speed,
+                    max_speed=stats.max_speed,
+                    kinetic_energy=stats.kinetic_energy,
+                    momentum=tuple(stats.momentum),
+                    centroid=tuple(stats.centroid))
+
+    def _out(self, out):
+        if out is None:
+            return np.empty(self.particles.size(), dtype=np.float32)
+        if out.shape != (self.particles.size(),) or out.dtype != np.float32:
+            raise ValueError("out must be a float32 array of shape (%d,)"
+                             % self.particles.size())
+        return out
+
+    @cython.boundscheck(False)
+    def get_speeds(self, out=None):
+        ''' The speed of each particle, as an (n,) float32 array. '''
+        out = self._out(out)
+        cdef float[::1] speeds = out
+        cdef size_t i
+        with nogil:
+            for i in range(self.particles.size()):
+                speeds[i] = self.particles[i].get_speed()
+        return out
+
+    @cython.boundscheck(False)
+    def get_x(self, out=None):
+        ''' The x coordinate of each particle, as an (n,) float32 array. '''
+        out = self._out(out)
+        cdef float[::1] xs = out
+        cdef size_t i
+        with nogil:
+            for i in range(self.particles.size()):
+                xs[i] = self.particles[i].get_x()
+        return out
+
 if __name__ == '__main__':
-    import numpy as np
     assert np.allclose(norm2(1, 2, 3), np.sqrt(14.0))
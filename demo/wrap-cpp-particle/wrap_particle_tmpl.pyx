@@ -0,0 +1,228 @@
+cimport cython
+from libcpp.vector cimport vector
+import numpy as np
+
+ctypedef long double longdouble
+
+cdef extern from "particle_tmpl.h" nogil:
+
+    cdef cppclass _Particle "Particle"[T]:
+        _Particle()
+        _Particle(T, T, T, T, T, T, T, T)
+        const T get_speed()
+        const T get_x()
+
+    T _norm2 "norm2"[T](T x, T y, T z)
+    T _rms_speeds "rms_speeds"[T](vector[const _Particle[T] *] *particles)
+    T _rms_speeds_n "rms_speeds"[T](const _Particle[T] *particles, size_t n)
+
+# One source for every instantiation: each function below is compiled once per
+# type, and the wrappers pick one with a switch on the dtype's type code.
+ctypedef fused real_t:
+    float
+    double
+    longdouble
+
+FIELDS = ('x', 'y', 'z', 'vx', 'vy', 'vz', 'mass', 'charge')
+
+# The bulk functions view each row of an (n, 8) array as a Particle<T>, which
+# relies on Particle<T> holding just its 8 fields, in order.
+if (sizeof(_Particle[float]) != 8 * sizeof(float) or
+        sizeof(_Particle[double]) != 8 * sizeof(double) or
+        sizeof(_Particle[longdouble]) != 8 * sizeof(longdouble)):
+    raise ImportError("Particle<T> is not laid out as 8 values of type T")
+
+# Python floats are doubles, so long double results are returned as NumPy
+# longdouble scalars, to keep their precision: each is written to `_box` and
+# read back out as a (new) scalar.
+_box = np.empty(1, dtype=np.longdouble)
+cdef longdouble[::1] _box_view = _box
+
+cdef object as_longdouble(longdouble value):
+    _box_view[0] = value
+    return _box[0]
+
+# depend on type conversion rules to handle this case...
+def norm2(double x, double y, double z):
+    cdef double pn = _norm2(x, y, z)
+    return pn
+
+cdef class Particle:
+    '''
+    Particle(x, y, z, vx, vy, vz, mass, charge, dtype='f')
+
+    Wraps a C++ Particle<T>, where T is float, double or long double for a
+    `dtype` of 'f', 'd' or 'g' (or the equivalent NumPy dtypes).  With long
+    double, pass NumPy longdoubles to keep their precision; the methods
+    return longdoubles too.
+    '''
+
+    cdef void *_thisptr
+    cdef char _typecode
+    cdef readonly object dtype
+
+    def __cinit__(self, x, y, z, vx, vy, vz, mass, charge, dtype='f'):
+        cdef longdouble[::1] v
+        self.dtype = np.dtype(dtype)
+        self._typecode = ord(self.dtype.char)
+        if self._typecode == b'f':
+            self._thisptr = new _Particle[float](x, y, z, vx, vy, vz,
+                                                 mass, charge)
+        elif self._typecode == b'd':
+            self._thisptr = new _Particle[double](x, y, z, vx, vy, vz,
+                                                  mass, charge)
+        elif self._typecode == b'g':
+            # Converted through an array, since converting each argument
+            # from a Python object would round it to double.
+            v = np.array([x, y, z, vx, vy, vz, mass, charge],
+                         dtype=np.longdouble)
+            self._thisptr = new _Particle[longdouble](
+                    v[0], v[1], v[2], v[3], v[4], v[5], v[6], v[7])
+        else:
+            raise TypeError("dtype must be float32, float64 or longdouble, "
+                            "not %s" % self.dtype)
+
+    def __dealloc__(self):
+        cdef _Particle[float] *pf = <_Particle[float] *>self._thisptr
+        cdef _Particle[double] *pd = <_Particle[double] *>self._thisptr
+        cdef _Particle[longdouble] *pg = <_Particle[longdouble] *>self._thisptr
+        if self._thisptr == NULL:
+            return
+        if self._typecode == b'f':
+            del pf
+        elif self._typecode == b'd':
+            del pd
+        else:
+            del pg
+
+    cpdef get_x(self):
+        if self._typecode == b'f':
+            return (<_Particle[float] *>self._thisptr).get_x()
+        elif self._typecode == b'd':
+            return (<_Particle[double] *>self._thisptr).get_x()
+        return as_longdouble((<_Particle[longdouble] *>self._thisptr).get_x())
+
+    cpdef get_speed(self):
+        if self._typecode == b'f':
+            return (<_Particle[float] *>self._thisptr).get_speed()
+        elif self._typecode == b'd':
+            return (<_Particle[double] *>self._thisptr).get_speed()
+        return as_longdouble(
+                (<_Particle[longdouble] *>self._thisptr).get_speed())
+
+cdef int collect(particles, char typecode,
+                 vector[const _Particle[real_t] *] *out) except -1:
+    for particle in particles:
+        if (not isinstance(particle, Particle) or
+                (<Particle>particle)._typecode != typecode):
+            raise TypeError("object %r is not an instance of Particle with "
+                            "the same dtype as the first." % particle)
+        out.push_back(<const _Particle[real_t] *>(<Particle>particle)._thisptr)
+    return 0
+
+@cython.boundscheck(False)
+cdef inline const _Particle[real_t] *rows(real_t[:, ::1] table) noexcept nogil:
+    return <const _Particle[real_t] *>&table[0, 0] if table.shape[0] else NULL
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef void speeds_loop(real_t[:, ::1] table, real_t[::1] out) noexcept nogil:
+    cdef:
+        Py_ssize_t i
+        const _Particle[real_t] *particles = rows(table)
+    for i in range(table.shape[0]):
+        out[i] = particles[i].get_speed()
+
+def _check_table(table):
+    table = np.asarray(table)
+    if table.dtype.char not in 'fdg':
+        raise TypeError("particles must be a float32, float64 or longdouble "
+                        "array, not %s" % table.dtype)
+    if table.ndim != 2 or table.shape[1] != len(FIELDS):
+        raise ValueError("particles must have shape (n, %d), got %r"
+                         % (len(FIELDS), table.shape))
+    return table
+
+def rms_speeds(particles):
+    '''
+    rms_speeds(particles) -> the root-mean-square speed of `particles`
+
+    `particles` is either a sequence of `Particle`s with the same dtype, or
+    an (n, 8) float32, float64 or longdouble array with one particle per row
+    and columns `FIELDS`.  A C-contiguous array is used in place, with no
+    per-particle work in Python.  For long double particles, the result is a
+    NumPy longdouble.
+    '''
+    cdef:
+        vector[const _Particle[float] *] vf
+        vector[const _Particle[double] *] vd
+        vector[const _Particle[longdouble] *] vg
+        float[:, ::1] tf
+        double[:, ::1] td
+        longdouble[:, ::1] tg
+        char typecode
+        double result
+        longdouble result_g
+
+    if not isinstance(particles, np.ndarray):
+        typecode = (<Particle?>particles[0])._typecode
+        if typecode == b'f':
+            collect(particles, typecode, &vf)
+            return _rms_speeds(&vf)
+        elif typecode == b'd':
+            collect(particles, typecode, &vd)
+            return _rms_speeds(&vd)
+        collect(particles, typecode, &vg)
+        return as_longdouble(_rms_speeds(&vg))
+
+    particles = _check_table(particles)
+    typecode = ord(particles.dtype.char)
+    if typecode == b'f':
+        tf = np.ascontiguousarray(particles)
+        with nogil:
+            result = _rms_speeds_n(rows(tf), tf.shape[0])
+    elif typecode == b'd':
+        td = np.ascontiguousarray(particles)
+        with nogil:
+            result = _rms_speeds_n(rows(td), td.shape[0])
+    else:
+        tg = np.ascontiguousarray(particles)
+        with nogil:
+            result_g = _rms_speeds_n(rows(tg), tg.shape[0])
+        return as_longdouble(result_g)
+    return result
+
+def speeds(particles, out=None):
+    '''
+    speeds(particles, out=None) -> the speed of each particle
+
+    `particles` is an (n, 8) array as for `rms_speeds`.  The speeds are
+    computed in its dtype and written to `out` if given, which must be a
+    C-contiguous array of that dtype and length n.
+    '''
+    particles = np.ascontiguousarray(_check_table(particles))
+    if out is None:
+        out = np.empty(particles.shape[0], dtype=particles.dtype)
+    elif out.dtype != particles.dtype or out.shape != particles.shape[:1]:
+        raise ValueError("out must be a %s array of shape %r"
+                         % (particles.dtype.name, particles.shape[:1]))
+    cdef float[:, ::1] tf
+    cdef double[:, ::1] td
+    cdef longdouble[:, ::1] tg
+    cdef float[::1] of
+    cdef double[::1] od
+    cdef longdouble[::1] og
+    cdef char typecode = ord(particles.dtype.char)
+    if typecode == b'f':
+        tf, of = particles, out
+        with nogil:
+            speeds_loop(tf, of)
+    elif typecode == b'd':
+        td, od = particles, out
+        with nogil:
+            speeds_loop(td, od)
+    else:
+        tg, og = particles, out
+        with nogil:
+            speeds_loop(tg, og)
+    return out
@@ -0,0 +1,382 @@
+#-----------------------------------------------------------------------------
+# Copyright (c) 2013, Enthought, Inc.
+# All rights reserved.  See LICENSE.txt for details.
+#-----------------------------------------------------------------------------
+
+'''
+benchmark.py
+
+Benchmark the registered Julia set implementations against each other.
+
+Each backend is run over a sweep of grid sizes, cutoffs and c values, with
+warm-up runs and repeats, and its result is checked against that of a
+reference backend.  The timings can be written out as JSON or CSV, and
+compared against an earlier run to catch regressions, e.g. after changing the
+compiler flags in `setup.py`.  Run
+
+    $ python benchmark.py -h
+
+for details.
+'''
+
+from __future__ import print_function, division
+
+import csv
+import json
+from collections import OrderedDict
+
+import numpy as np
+
+import utils
+
+#-----------------------------------------------------------------------------
+# Backend registry
+#-----------------------------------------------------------------------------
+
+class Backend(object):
+    ''' A Julia set implementation: the function `function` from the module
+    `module`, called as `compute_julia(cr, ci, N, bound, lim, cutoff,
+    **kwargs)` and returning `(julia, runtime)`.
+
+    The module is imported on first use, as are keyword arguments given as a
+    `(module, name)` tuple, e.g. `kernel=('julia_cython_solution', 'kernel')`;
+    backends whose modules cannot be imported (e.g. an extension module that
+    has not been built) are reported as unavailable.  `threaded` backends
+    take a `num_threads` argument.
+    '''
+
+    def __init__(self, name, module, function='compute_julia', label=None,
+                 threaded=False, **kwargs):
+        self.name = name
+        self.module = module
+        self.function = function
+        self.label = label or name
+        self.threaded = threaded
+        self.kwargs = kwargs
+        self._compute_julia = None
+
+    @property
+    def available(self):
+        try:
+            self.load()
+        except ImportError:
+            return False
+        return True
+
+    def load(self):
+        if self._compute_julia is None:
+            for key, value in self.kwargs.items():
+                if isinstance(value, tuple):
+                    self.kwargs[key] = utils.importer(*value)
+            self._compute_julia = utils.importer(self.module, self.function)
+        return self._compute_julia
+
+    def __call__(self, cr, ci, N, bound, lim, cutoff, **kwargs):
+        compute_julia = self.load()
+        kwargs.update(self.kwargs)
+        julia, runtime = compute_julia(cr, ci, N, bound, lim, cutoff,
+                                       **kwargs)
+        return np.asarray(julia), runtime
+
+BACKENDS = OrderedDict()
+
+def register(name, module, function='compute_julia', label=None,
+             threaded=False, **kwargs):
+    ''' Registers a Julia set implementation under `name`; see `Backend`. '''
+    BACKENDS[name] = Backend(name, module, function, label, threaded,
+                             **kwargs)
+    return BACKENDS[name]
+
+def available_backends(names=None):
+    ''' Returns the registered backends named in `names` (default all) that
+    can be imported.
+    '''
+    names = names or list(BACKENDS)
+    return [BACKENDS[name] for name in names if BACKENDS[name].available]
+
+register('python', 'julia_pure_python', label="Python only")
+register('numpy', 'julia_python_numpy_solution',
+         label="Python only + Numpy expressions")
+register('python-cython-kernel', 'julia_pure_python',
+         label="Python + cythonized kernel",
+         kernel=('julia_cython_solution', 'kernel'))
+register('multiprocessing', 'julia_multiprocessing_solution',
+         'compute_julia_block', label="Multiprocessing + Python kernel")
+register('multiprocessing-cython-kernel', 'julia_multiprocessing_solution',
+         'compute_julia_block', label="Multiprocessing + cythonized kernel",
+         kernel=('julia_cython_solution', 'kernel'))
+register('cython', 'julia_cython_solution', label="All Cython")
+register('cython-float64', 'julia_cython_solution',
+         label="All Cython, double precision", dtype='float64')
+register('cython-longdouble', 'julia_cython_solution',
+         label="All Cython, long double precision", dtype='longdouble')
+register('cython-auto', 'julia_cython_solution',
+         label="All Cython, precision chosen by grid spacing", dtype='auto')
+register('cython-simd', 'julia_cython_solution', 'compute_julia_simd',
+         label="All Cython, lock-step kernel")
+register('cython-subdivide', 'julia_cython_solution',
+         'compute_julia_subdivide', label="All Cython, rectangle subdivision")
+register('cython-parallel', 'julia_cython_solution', 'compute_julia_parallel',
+         label="All Cython, parallel", threaded=True)
+register('cython-tiled', 'julia_cython_solution', 'compute_julia_tiled',
+         label="All Cython, parallel tiles", threaded=True)
+
+#-----------------------------------------------------------------------------
+# Running the benchmarks
+#-----------------------------------------------------------------------------
+
+FIELDS = ['backend', 'N', 'cutoff', 'cr', 'ci', 'repeat',
+          'min', 'median', 'mean', 'speedup', 'mismatch', 'ok']
+
+SCALING_FIELDS = ['backend', 'threads', 'N', 'min', 'median',
+                  'speedup', 'efficiency']
+
+def time_backend(backend, cr, ci, N, bound, lim, cutoff, repeat=3, warmup=1,
+                 **kwargs):
+    ''' Runs `backend` `warmup` times untimed, then `repeat` times; returns
+    the result of the last run and the list of runtimes.
+    '''
+    for _ in range(warmup):
+        backend(cr, ci, N, bound, lim, cutoff, **kwargs)
+    runtimes = []
+    for _ in range(max(repeat, 1)):
+        julia, runtime = backend(cr, ci, N, bound, lim, cutoff, **kwargs)
+        runtimes.append(runtime)
+    return julia, runtimes
+
+def run(backends, Ns, cutoffs, cs, bound=1.5, lim=4., repeat=3, warmup=1,
+        reference='python', tolerance=0.01, verbose=False):
+    ''' Times each backend in `backends` for every combination of grid size in
+    `Ns`, cutoff in `cutoffs` and complex c value in `cs`.
+
+    Each result is compared with that of the `reference` backend: 'mismatch'
+    is the fraction of grid points whose escape counts differ, and 'ok' tells
+    whether that is within `tolerance` (single precision kernels may differ
+    at a few points on the boundary of the set).  Returns a list of dicts
+    with the keys in `FIELDS`.
+    '''
+    reference = BACKENDS[reference]
+    results = []
+    for c in cs:
+        for cutoff in cutoffs:
+            for N in Ns:
+                args = (c.real, c.imag, N, bound, lim, cutoff)
+                ref_julia, ref_times = time_backend(reference, *args,
+                                                    repeat=1, warmup=0)
+                for backend in backends:
+                    if backend is reference:
+                        julia, runtimes = ref_julia, ref_times
+                    else:
+                        julia, runtimes = time_backend(backend, *args,
+                                                       repeat=repeat,
+                                                       warmup=warmup)
+                    mismatch = float(np.mean(julia != ref_julia))
+                    result = OrderedDict([
+                        ('backend', backend.name),
+                        ('N', N),
+                        ('cutoff', cutoff),
+                        ('cr', c.real),
+                        ('ci', c.imag),
+                        ('repeat', len(runtimes)),
+                        ('min', min(runtimes)),
+                        ('median', float(np.median(runtimes))),
+                        ('mean', float(np.mean(runtimes))),
+                        ('speedup', min(ref_times) / max(min(runtimes), 1e-9)),
+                        ('mismatch', mismatch),
+                        ('ok', mismatch <= tolerance),
+                        ])
+                    if verbose:
+                        print("{backend:>29s} N={N:<5d} cutoff={cutoff:<8g} "
+                              "min={min:.4g}s median={median:.4g}s "
+                              "speedup={speedup:.3g} "
+                              "mismatch={mismatch:.2%}".format(**result))
+                    results.append(result)
+    return results
+
+def scaling(backend, thread_counts, N, cutoff, c, bound=1.5, lim=4.,
+            repeat=3, warmup=1, weak=False, verbose=False):
+    ''' Times the `threaded` `backend` with each number of threads in
+    `thread_counts`.
+
+    For strong scaling, the grid is `N` x `N` throughout and the speedup is
+    relative to the first thread count.  For weak scaling (`weak`), N grows
+    with the square root of the number of threads, keeping the number of
+    points per thread fixed; the efficiency is then the ratio of runtimes,
+    and the speedup the efficiency times the relative number of threads.
+    Returns a list of dicts with the keys in `SCALING_FIELDS`.
+    '''
+    if not backend.threaded:
+        raise ValueError("backend %r does not take num_threads" % backend.name)
+    results = []
+    base_threads = base_time = None
+    for threads in thread_counts:
+        n = N
+        if weak:
+            n = int(round(N * np.sqrt(threads / thread_counts[0])))
+        _, runtimes = time_backend(backend, c.real, c.imag, n, bound, lim,
+                                   cutoff, repeat=repeat, warmup=warmup,
+                                   num_threads=threads)
+        if base_time is None:
+            base_threads, base_time = threads, min(runtimes)
+        ratio = base_time / max(min(runtimes), 1e-9)
+        if weak:
+            efficiency = ratio
+            speedup = ratio * threads / base_threads
+        else:
+            speedup = ratio
+            efficiency = ratio * base_threads / threads
+        result = OrderedDict([
+            ('backend', backend.name),
+            ('threads', threads),
+            ('N', n),
+            ('min', min(runtimes)),
+            ('median', float(np.median(runtimes))),
+            ('speedup', speedup),
+            ('efficiency', efficiency),
+            ])
+        if verbose:
+            print("{backend:>29s} threads={threads:<4d} N={N:<5d} "
+                  "min={min:.4g}s speedup={speedup:.3g} "
+                  "efficiency={efficiency:.0%}".format(**result))
+        results.append(result)
+    return results
+
+#-----------------------------------------------------------------------------
+# Reporting
+#-----------------------------------------------------------------------------
+
+def write_json(results, fname):
+    with open(fname, 'w') as fh:
+        json.dump(results, fh, indent=2)
+
+def read_json(fname):
+    with open(fname) as fh:
+        return json.load(fh)
+
+def write_csv(results, fname):
+    with open(fname, 'w') as fh:
+        writer = csv.DictWriter(fh, list(results[0]) if results else FIELDS)
+        writer.writeheader()
+        writer.writerows(results)
+
+def scaling_table(results, stat='min'):
+    ''' Returns a table (as a string) of the `stat` runtime for each backend
+    (rows) and grid size (columns), one table per cutoff and c value.
+    '''
+    lines = []
+    keys = OrderedDict.fromkeys((r['cr'], r['ci'], r['cutoff'])
+                                for r in results)
+    for cr, ci, cutoff in keys:
+        rows = [r for r in results
+                if (r['cr'], r['ci'], r['cutoff']) == (cr, ci, cutoff)]
+        Ns = sorted(set(r['N'] for r in rows))
+        backends = list(OrderedDict.fromkeys(r['backend'] for r in rows))
+        width = max(len(name) for name in backends) + 1
+        lines.append("c = {:.4g}{:+.4g}j, cutoff = {:g} "
+                     "({} runtime in s)".format(cr, ci, cutoff, stat))
+        lines.append("N".rjust(width) +
+                     "".join("{:>11d}".format(N) for N in Ns))
+        for name in backends:
+            by_N = dict((r['N'], r) for r in rows if r['backend'] == name)
+            cells = []
+            for N in Ns:
+                r = by_N.get(N)
+                cell = "-" if r is None else "{:.4g}".format(r[stat])
+                if r is not None and not r['ok']:
+                    cell += "!"
+                cells.append("{:>11s}".format(cell))
+            lines.append(name.rjust(width) + "".join(cells))
+        lines.append("")
+    return "\n".join(lines)
+
+def regressions(results, baseline, threshold=1.1, stat='min'):
+    ''' Returns the results that are more than `threshold` times slower than
+    the matching result in `baseline` (e.g. as loaded by `read_json`).
+    '''
+    def key(r):
+        return (r['backend'], r['N'], r['cutoff'], r['cr'], r['ci'])
+    base = dict((key(r), r) for r in baseline)
+    return [r for r in results
+            if key(r) in base and r[stat] > threshold * base[key(r)][stat]]
+
+#-----------------------------------------------------------------------------
+# Command line
+#-----------------------------------------------------------------------------
+
+def scaling_main(args):
+    try:
+        openmp_info = utils.importer('julia_cython_solution', 'openmp_info')
+    except ImportError:
+        pass
+    else:
+        print("OpenMP: {enabled}, default number of threads: "
+              "{max_threads}".format(**openmp_info()))
+    names = args.backends or [name for name in BACKENDS
+                              if BACKENDS[name].threaded]
+    results = []
+    for backend in available_backends(names):
+        results.extend(scaling(backend, args.threads, args.N[0],
+                               args.cutoff[0], args.c[0], lim=args.lim,
+                               repeat=args.repeat, warmup=args.warmup,
+                               weak=args.weak, verbose=True))
+    if args.json:
+        write_json(results, args.json)
+    if args.csv:
+        write_csv(results, args.csv)
+    return 0
+
+def main(args):
+    if args.threads:
+        return scaling_main(args)
+    backends = available_backends(args.backends)
+    results = run(backends, args.N, args.cutoff, args.c, lim=args.lim,
+                  repeat=args.repeat, warmup=args.warmup,
+                  reference=args.reference, verbose=True)
+    print()
+    print(scaling_table(results))
+    if args.json:
+        write_json(results, args.json)
+    if args.csv:
+        write_csv(results, args.csv)
+    failed = [r for r in results if not r['ok']]
+    for r in failed:
+        print("MISMATCH: {backend} N={N} cutoff={cutoff} c={cr}{ci:+}j: "
+              "{mismatch:.2%} of points differ".format(**r))
+    slow = []
+    if args.baseline:
+        slow = regressions(results, read_json(args.baseline), args.threshold)
+        for r in slow:
+            print("REGRESSION: {backend} N={N} cutoff={cutoff} c={cr}{ci:+}j: "
+                  "{min:.4g}s".format(**r))
+    return 1 if failed or slow else 0
+
+if __name__ == '__main__':
+    import sys
+    from argparse import ArgumentParser
+    parser = ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('-b', '--backends', nargs='+', choices=list(BACKENDS),
+                        help="The backends to run, default all available.")
+    parser.add_argument('-N', nargs='+', type=int, default=[100, 200, 400],
+                        help="The grid sizes to run.")
+    parser.add_argument('--cutoff', nargs='+', type=float, default=[1e3],
+                        help="The cutoff values to run.")
+    parser.add_argument('-c', nargs='+', type=complex,
+                        default=[complex(-0.1, 0.651)],
+                        help="The c values to run, e.g. -0.1+0.651j.")
+    parser.add_argument('--lim', type=float, default=4.)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--reference', default='python', choices=list(BACKENDS),
+                        help="The backend whose results the others must match.")
+    parser.add_argument('--json', help="Write the results to this JSON file.")
+    parser.add_argument('--csv', help="Write the results to this CSV file.")
+    parser.add_argument('--baseline', help="""A JSON file from an earlier run;
+            report (and fail on) runs slower than it by --threshold.""")
+    parser.add_argument('--threshold', type=float, default=1.1)
+    parser.add_argument('--threads', nargs='+', type=int, help="""Instead of
+            comparing backends, time the threaded backends with each of these
+            numbers of threads, using the first N, cutoff and c given.""")
+    parser.add_argument('--weak', action='store_true', help="""With
+            --threads, measure weak scaling: grow N with the number of
+            threads.""")
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,175 @@
+#-----------------------------------------------------------------------------
+# Copyright (c) 2013, Enthought, Inc.
+# All rights reserved.  See LICENSE.txt for details.
+#-----------------------------------------------------------------------------
+
+'''
+cache.py
+
+A memoizing cache for Julia set results, so that revisiting parameters (e.g.
+dragging a slider in `julia_ui.py` back and forth) does not recompute them.
+
+    >>> cache = JuliaCache(max_bytes=64 * 2**20)
+    >>> compute_julia = cache.wrap(julia_cython_solution.compute_julia)
+    >>> julia, runtime = compute_julia(-0.1, 0.651, 200)   # computed
+    >>> julia, runtime = compute_julia(-0.1, 0.651, 200)   # from the cache
+'''
+
+from __future__ import print_function
+
+import hashlib
+import inspect
+import os
+from collections import OrderedDict
+from time import time
+
+import numpy as np
+
+def _key_value(value):
+    # A hashable stand-in for a parameter value in a cache key, with a repr
+    # that is the same in every process, since it names the files on disk.
+    # Arrays (such as a colour table) are identified by their contents, and
+    # functions and types (such as a kernel or dtype) by their names.
+    if isinstance(value, np.ndarray):
+        return (value.dtype.str, value.shape,
+                hashlib.sha1(np.ascontiguousarray(value)).hexdigest())
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return float(value)
+    if callable(value) and hasattr(value, '__name__'):
+        return '%s.%s' % (getattr(value, '__module__', None), value.__name__)
+    return value
+
+class JuliaCache(object):
+    ''' A least-recently-used cache of Julia set arrays, keyed on the backend
+    and all of the parameters of the computation.
+
+    At most `max_bytes` of arrays are kept in memory, evicting the least
+    recently used ones first.  If `directory` is given, results are also
+    saved there as .npy files and looked up there on a miss, so they persist
+    between sessions.  Cached arrays are returned read-only, since they are
+    shared between callers.
+    '''
+
+    def __init__(self, max_bytes=256 * 2**20, directory=None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        if directory is not None and not os.path.isdir(directory):
+            os.makedirs(directory)
+        self._arrays = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(backend, cr, ci, N, **params):
+        ''' The key for `compute_julia(cr, ci, N, **params)` with the
+        implementation `backend`; the other parameters are included in sorted
+        order.
+        '''
+        return (backend, float(cr), float(ci), int(N)) + tuple(
+                (name, _key_value(params[name])) for name in sorted(params))
+
+    def _path(self, key):
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, digest + '.npy')
+
+    def get(self, key):
+        ''' Returns the array cached under `key`, or None. '''
+        julia = self._arrays.get(key)
+        if julia is None and self.directory is not None:
+            path = self._path(key)
+            if os.path.exists(path):
+                julia = np.load(path)
+                julia.setflags(write=False)
+        if julia is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._insert(key, julia)
+        return julia
+
+    def put(self, key, julia):
+        ''' Caches (a read-only copy of) `julia` under `key` and returns it. '''
+        julia = np.array(julia)
+        julia.setflags(write=False)
+        self._insert(key, julia)
+        if self.directory is not None:
+            np.save(self._path(key), julia)
+        return julia
+
+    def _insert(self, key, julia):
+        # (Re-)inserts `key` as the most recently used entry, evicting the
+        # least recently used ones to stay within `max_bytes`.
+        if key in self._arrays:
+            self.nbytes -= self._arrays.pop(key).nbytes
+        if julia.nbytes > self.max_bytes:
+            return
+        self._arrays[key] = julia
+        self.nbytes += julia.nbytes
+        while self.nbytes > self.max_bytes:
+            _, evicted = self._arrays.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+            self.evictions += 1
+
+    def clear(self):
+        ''' Empties the in-memory cache; files on disk are left alone. '''
+        self._arrays.clear()
+        self.nbytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return dict(hits=self.hits, misses=self.misses,
+                    evictions=self.evictions, entries=len(self._arrays),
+                    nbytes=self.nbytes,
+                    hit_rate=self.hits / float(lookups) if lookups else 0.0)
+
+    def wrap(self, compute_julia, backend=None):
+        ''' Returns a caching version of `compute_julia`, with the same
+        signature and `(julia, runtime)` return value.
+
+        On a hit, `runtime` is the time taken by the lookup.  `backend`
+        names the implementation in the cache key, and defaults to its
+        module and function name.  Parameters that are not given take
+        `compute_julia`'s defaults in the key, so that leaving one out and
+        passing its default share an entry.  If `out` is given, the result
+        is written to it, and it is not part of the key.
+        '''
+        if backend is None:
+            backend = '%s.%s' % (getattr(compute_julia, '__module__', None),
+                                 compute_julia.__name__)
+        try:
+            signature = inspect.signature(compute_julia)
+        except (AttributeError, TypeError, ValueError):
+            # Python 2, or a function without an introspectable signature.
+            signature = None
+
+        def cached_compute_julia(cr, ci, N, *args, **kwargs):
+            t0 = time()
+            if signature is not None:
+                bound = signature.bind(cr, ci, N, *args, **kwargs)
+                bound.apply_defaults()
+                params = OrderedDict(bound.arguments)
+                for _ in range(3):
+                    params.popitem(last=False)
+            else:
+                params = dict(kwargs)
+                params.update(('arg%d' % i, arg) for i, arg in enumerate(args))
+            out = params.pop('out', None)
+            key = self.key(backend, cr, ci, N, **params)
+            julia = self.get(key)
+            if julia is not None:
+                if out is not None:
+                    out[...] = julia
+                    julia = out
+                return julia, time() - t0
+            julia, runtime = compute_julia(cr, ci, N, *args, **kwargs)
+            cached = self.put(key, julia)
+            return (julia if out is not None else cached), runtime
+
+        cached_compute_julia.__name__ = compute_julia.__name__
+        cached_compute_julia.__doc__ = compute_julia.__doc__
+        cached_compute_julia.cache = self
+        return cached_compute_julia
@@ -0,0 +1,148 @@
+#-----------------------------------------------------------------------------
+# Copyright (c) 2013, Enthought, Inc.
+# All rights reserved.  See LICENSE.txt for details.
+#-----------------------------------------------------------------------------
+
+'''
+framestream.py
+
+Render animations in bounded memory: frames are computed a batch at a time in
+a pool of worker processes and appended to a memory-mapped .npy stack, so only
+one batch of frames is ever held in RAM.  Turning the frames into images is a
+separate, optional pass, also spread over worker processes.
+
+    >>> stream_frames(compute_frame, params, 'frames.npy', (2, 5000))
+    >>> encode_frames('frames.npy', save_png,
+    ...               ['frame_{:05d}.png'.format(i) for i in range(n)])
+
+`compute_frame` and `save_png` must be module-level functions, so that they
+can be sent to the worker processes.  The stack can be reloaded with
+`np.load('frames.npy', mmap_mode='r')`.
+'''
+
+from __future__ import print_function
+
+from multiprocessing import Pool, cpu_count
+
+import numpy as np
+
+class FrameWriter(object):
+    ''' Appends `nframes` frames of the given `shape` and `dtype` to a
+    memory-mapped .npy file, `filename`.
+
+    The file is created at its full size up front, and the frames are
+    written to it through `array`, the memory-mapped (nframes,) + `shape`
+    array.  They can be written one at a time with `append`, or a batch at a
+    time by computing straight into `next_batch(n)`.  Written pages are
+    flushed to disk every `flush_every` frames, so the operating system can
+    drop them from memory.
+    '''
+
+    def __init__(self, filename, nframes, shape, dtype=np.float64,
+                 flush_every=64):
+        self.filename = filename
+        self.flush_every = flush_every
+        self.array = np.lib.format.open_memmap(
+                        filename, mode='w+', dtype=dtype,
+                        shape=(nframes,) + tuple(shape))
+        self.count = 0
+        self._unflushed = 0
+
+    def __len__(self):
+        return self.count
+
+    def next_batch(self, n):
+        ''' Returns a view of the next `n` (or fewer, at the end) unwritten
+        frames and counts them as written; the caller fills them in.
+        '''
+        start = self.count
+        stop = min(start + n, self.array.shape[0])
+        self._advance(stop - start)
+        return self.array[start:stop]
+
+    def append(self, frame):
+        ''' Writes `frame` after the frames written so far. '''
+        if self.count == self.array.shape[0]:
+            raise IndexError("all %d frames have been written"
+                             % self.array.shape[0])
+        self.array[self.count] = frame
+        self._advance(1)
+
+    def _advance(self, n):
+        self.count += n
+        self._unflushed += n
+        if self._unflushed >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        self.array.flush()
+        self._unflushed = 0
+
+    def close(self):
+        ''' Flushes the frames to disk and releases the memory map. '''
+        if self.array is not None:
+            self.flush()
+            self.array = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def stream_frames(compute_frame, params, filename, shape, dtype=np.float64,
+                  nprocs=None, batch_size=None, progress=None):
+    ''' Computes `compute_frame(p)` for each `p` in `params` in a pool of
+    `nprocs` worker processes (default the number of CPUs), writing the
+    frames in order to the .npy stack `filename`.
+
+    Each frame must be an array of the given `shape` and `dtype`.  At most
+    `batch_size` frames (default 4 per process) are held in memory at once.
+    If given, `progress(done, total)` is called after each batch.  Returns
+    the number of frames written.
+    '''
+    params = list(params)
+    nprocs = nprocs or cpu_count()
+    batch_size = batch_size or 4 * nprocs
+    pool = Pool(nprocs)
+    try:
+        with FrameWriter(filename, len(params), shape, dtype) as writer:
+            for start in range(0, len(params), batch_size):
+                batch = params[start:start + batch_size]
+                for frame in pool.imap(compute_frame, batch):
+                    writer.append(frame)
+                if progress is not None:
+                    progress(len(writer), len(params))
+            return len(writer)
+    finally:
+        pool.close()
+        pool.join()
+
+# --- Worker-side view of the frame stack being encoded ----------------------
+_frames = None
+
+def _init_encoder(filename):
+    ''' Pool initializer; memory-maps the frame stack in each worker. '''
+    global _frames
+    _frames = np.load(filename, mmap_mode='r')
+
+def _encode(args):
+    encode, index, name = args
+    encode(_frames[index], name)
+    return name
+
+def encode_frames(filename, encode, names, nprocs=None):
+    ''' Calls `encode(frame, name)` for each frame of the .npy stack
+    `filename` and the corresponding entry of `names`, in a pool of `nprocs`
+    worker processes.
+
+    The workers read the frames straight from the memory-mapped file, so
+    only the frame indices are sent to them.  Returns the list of names.
+    '''
+    pool = Pool(nprocs or cpu_count(), _init_encoder, (filename,))
+    try:
+        return pool.map(_encode, [(encode, i, name)
+                                  for i, name in enumerate(names)])
+    finally:
+        pool.close()
+        pool.join()
@@ -27,12 +27,10 @@ for details.
 import numpy as np
 import pylab as pl
 
-# --- Import the various julia set computation modules -----------------------
-import julia_pure_python
-import julia_cython_solution as julia_cython
-# import julia_cython
-import julia_python_numpy_solution as julia_python_numpy
-import julia_multiprocessing_solution as julia_multiprocessing
+import utils
+
+# --- The registry of julia set computation modules -------------------------
+import benchmark
 
 def printer(label, runtime, speedup):
     ''' Given a label, the total runtime in seconds, and a speedup value,
@@ -51,16 +49,21 @@ def printer(label, runtime, speedup):
 # (-0.4 + 0.6j) 
 # (0.285 + 0.01j)
 
-def plot_julia(kwargs, compute_julia):
+def plot_julia(kwargs, compute_julia, compute_julia_batch=None):
     ''' Given parameters dict in `kwargs` and a function to compute the Julia
     set (`compute_julia`), plots the resulting Julia set with appropriately
     labeled axes.
+
+    If `compute_julia_batch` is given, all the Julia sets are computed with
+    it in one call instead.
     '''
     kwargs = kwargs.copy()
 
     def _plotter(kwargs):
-        bound = kwargs['bound']
-        julia, _ = compute_julia(**kwargs)
+        bound, c = kwargs['bound'], kwargs['c']
+        julia = kwargs.get('julia')
+        if julia is None:
+            julia, _ = compute_julia(c.real, c.imag, kwargs['N'], bound)
         julia = np.log(julia)
         pl.imshow(julia, 
                   interpolation='nearest',
@@ -76,8 +79,13 @@ def plot_julia(kwargs, compute_julia):
     cvals = [0.285+0.01j, -0.1+0.651j, -0.4+0.6j, -0.8+0.156j]
     subplots = ['221',    '222',       '223',     '224'      ]
 
-    for c, sp in zip(cvals, subplots):
-        kwargs.update(c=c)
+    if compute_julia_batch is not None:
+        julias, _ = compute_julia_batch(cvals, kwargs['N'], kwargs['bound'])
+    else:
+        julias = [None] * len(cvals)
+
+    for c, julia, sp in zip(cvals, julias, subplots):
+        kwargs.update(c=c, julia=julia)
         pl.subplot(sp)
         _plotter(kwargs)
 
@@ -86,44 +94,17 @@ def plot_julia(kwargs, compute_julia):
 def compare_runtimes(kwargs):
     ''' Given a parameter dict `kwargs`, runs different implementations of the
     Julia set computation and compares the runtimes of each.
-    '''
-
-    ref_julia, python_time = julia_pure_python.compute_julia(**kwargs)
-    printer("Python only", python_time, 1.0)
-
-    _, numpy_time = julia_python_numpy.compute_julia(**kwargs)
-    assert np.allclose(ref_julia, _)
-    printer("Python only + Numpy expressions", numpy_time,
-            python_time / numpy_time)
-
-    _, cython_kernel_time = julia_pure_python.compute_julia(
-                                    kernel=julia_cython.kernel, **kwargs)
-    assert np.allclose(ref_julia, _)
-    printer("Python + cythonized kernel", cython_kernel_time, 
-            python_time / cython_kernel_time)
 
-    _, mp_time = julia_multiprocessing.compute_julia_block(kernel=julia_pure_python.kernel, **kwargs)
-    assert np.allclose(ref_julia, _)
-    printer("Multiprocessing + Python kernel", mp_time, python_time / mp_time)
-
-    _, mp_time = julia_multiprocessing.compute_julia_block(kernel=julia_cython.kernel, **kwargs)
-    assert np.allclose(ref_julia, _)
-    printer("Multiprocessing + cythonized kernel", mp_time, python_time / mp_time)
-
-    _, cython_no_opt_time = julia_cython.compute_julia_no_opt(**kwargs)
-    assert np.allclose(ref_julia, _)
-    printer("All Cython, no optimizations", cython_no_opt_time, 
-            python_time / cython_no_opt_time)
-
-    _, cython_opt_time = julia_cython.compute_julia_opt(**kwargs)
-    assert np.allclose(ref_julia, _)
-    printer("All Cython, Numpy optimizations", cython_opt_time,
-            python_time / cython_opt_time)
-
-    _, ext_opt_time = julia_cython.compute_julia_ext(**kwargs)
-    assert np.allclose(ref_julia, _)
-    printer("All C version, wrapped with Cython", ext_opt_time,
-            python_time / ext_opt_time)
+    See `benchmark.py` for more thorough benchmarks.
+    '''
+    results = benchmark.run(benchmark.available_backends(),
+                            [kwargs['N']], [1e6], [kwargs['c']],
+                            bound=kwargs['bound'], lim=1000.,
+                            repeat=1, warmup=0)
+    for result in results:
+        assert result['ok']
+        printer(benchmark.BACKENDS[result['backend']].label,
+                result['min'], result['speedup'])
 
 def main(args):
     ''' The main entry point; branches on whether `args.action` is "plot" or
@@ -135,7 +116,18 @@ def main(args):
                   bound=bound)
 
     if args.action == 'plot':
-        plot_julia(kwargs, julia_cython.compute_julia_ext)
+        suffix = args.module.rsplit('.', 1)[-1]
+        if suffix in ('so', 'pyd', 'pyx'):
+            utils.compiler(args.setup)
+        compute_julia = utils.importer(args.module, args.function)
+        compute_julia_batch = None
+        if args.function == 'compute_julia':
+            try:
+                compute_julia_batch = utils.importer(args.module,
+                                                     'compute_julia_batch')
+            except ImportError:
+                pass
+        plot_julia(kwargs, compute_julia, compute_julia_batch)
     elif args.action == 'compare':
         compare_runtimes(kwargs)
 
@@ -145,6 +137,13 @@ when computing the Julia set."""
 help_arg_n = """ The number of grid points in each dimension; larger for more
 resolution.  (default 100)) """
 
+help_arg_m = """ The module providing the Julia set function to plot -- either a
+pure python module or a Cython .pyx file, which is compiled automatically.
+(default julia_cython_solution.pyx) """
+
+help_arg_f = """ The function from the module to plot with, e.g.
+compute_julia_subdivide.  (default compute_julia) """
+
 help_arg_a = """ Either *plot* an approximation of a Julia set with resolution
 N (default), or *compare* the runtimes for different implementations.) """
 
@@ -158,6 +157,11 @@ if __name__ == '__main__':
                         default='plot', 
                         choices=('plot', 'compare'),
                         help=help_arg_a)
+    parser.add_argument('-m', '--module', default='julia_cython_solution.pyx',
+                        help=help_arg_m)
+    parser.add_argument('-f', '--function', default='compute_julia',
+                        help=help_arg_f)
+    parser.add_argument('--setup', default='setup.py')
 
     args = parser.parse_args()
     main(args)
@@ -0,0 +1,89 @@
+#-----------------------------------------------------------------------------
+# Copyright (c) 2013, Enthought, Inc.
+# All rights reserved.  See LICENSE.txt for details.
+#-----------------------------------------------------------------------------
+
+'''
+julia_animation.py
+
+Render an animation of the Julia set as c goes around a circle in the complex
+plane, e.g.
+
+    $ python julia_animation.py -n 10000 -N 256 --png
+
+The frames are computed a batch at a time with `compute_julia_batch`, straight
+into a memory-mapped .npy stack (see `framestream.py`), so the number of
+frames is limited by disk space rather than RAM.  With `--png`, the frames are
+then written out as images by a pool of worker processes.
+'''
+
+from __future__ import print_function
+
+import sys
+
+import numpy as np
+
+import utils
+from framestream import FrameWriter, encode_frames
+
+def circle(nframes, radius=0.7885):
+    ''' `nframes` c values going once around the circle `radius`. '''
+    return radius * np.exp(2j * np.pi * np.arange(nframes) / nframes)
+
+def render(filename, cs, N, bound=1.5, lim=4., cutoff=1000.,
+           batch_size=64, num_threads=0):
+    ''' Computes the Julia set for each c value in `cs` into the .npy stack
+    `filename`, `batch_size` frames at a time.  Returns the total compute
+    time.
+    '''
+    from julia_cython_solution import compute_julia_batch
+
+    runtime = 0.
+    with FrameWriter(filename, len(cs), (N, N), np.uint32) as writer:
+        for start in range(0, len(cs), batch_size):
+            out = writer.next_batch(batch_size)
+            _, t = compute_julia_batch(cs[start:start + len(out)], N, bound,
+                                       lim, cutoff, num_threads, out=out)
+            runtime += t
+            print("\r{} / {}".format(len(writer), len(cs)), end='')
+            sys.stdout.flush()
+    print()
+    return runtime
+
+def save_png(julia, name):
+    ''' Writes a frame to the image file `name`. '''
+    import matplotlib
+    matplotlib.use('Agg')
+    from matplotlib import pyplot as plt
+    plt.imsave(name, np.log1p(julia), origin='lower')
+
+def main(args):
+    utils.compiler(args.setup)
+    cs = circle(args.nframes, args.radius)
+    runtime = render(args.output, cs, args.N, args.bound, cutoff=args.cutoff,
+                     batch_size=args.batch_size)
+    print("computed {} frames in {:.3g} s".format(len(cs), runtime))
+    if args.png:
+        names = ['julia_{:05d}.png'.format(i) for i in range(len(cs))]
+        encode_frames(args.output, save_png, names)
+        print("wrote {} ... {}".format(names[0], names[-1]))
+
+description = """ Render an animation of the Julia set as c goes around a
+circle, to a memory-mapped .npy stack of frames."""
+
+if __name__ == '__main__':
+    from argparse import ArgumentParser
+
+    parser = ArgumentParser(description=description)
+    parser.add_argument('-n', '--nframes', type=int, default=360)
+    parser.add_argument('-N', type=int, default=200)
+    parser.add_argument('--bound', type=float, default=1.5)
+    parser.add_argument('--cutoff', type=float, default=1000.)
+    parser.add_argument('--radius', type=float, default=0.7885)
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('-o', '--output', default='julia_frames.npy')
+    parser.add_argument('--png', action='store_true',
+                        help="also write each frame to a PNG file")
+    parser.add_argument('--setup', default='setup.py')
+
+    main(parser.parse_args())
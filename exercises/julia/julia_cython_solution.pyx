@@ -14,68 +14,638 @@ import numpy as np
 # --- Cython cimports --------------------------------------------------------
 cimport cython
 from libc.stdint cimport uint32_t, int32_t
-from cython.parallel cimport prange
+from libc.math cimport ceil, log, log1p
+from cython.parallel cimport prange, parallel, threadid
+
+cdef extern from "julia_openmp.h":
+    bint JULIA_OPENMP
+    int omp_get_max_threads() nogil
 
 # --- Ctypedefs --------------------------------------------------------
 ctypedef float     real_t
 ctypedef uint32_t  uint_t
 ctypedef int32_t   int_t
+ctypedef unsigned char uchar_t
+
+# --- The floating point types the Julia set can be computed with ------------
+# (The functions specialised on it are declared `noexcept`: Cython would
+# otherwise check for a Python exception, taking the GIL, after every call.)
+ctypedef fused any_real_t:
+    float
+    double
+    long double
+
+# --- Number of points advanced in lock-step by `kernel_lanes` ---------------
+DEF LANES = 16
+# --- Lock-step iterations between checks for finished lanes -----------------
+DEF RETIRE_EVERY = 8
+# --- Upper bound on the thread count `openmp_info` can measure --------------
+DEF MAX_THREADS = 1024
+# --- `choose_dtype` picks float32 if pixels are this many float32 ulps apart -
+DEF AUTO_FLOAT32_ULPS = 1024
+# --- Marks grid points not yet computed by `compute_julia_subdivide` --------
+DEF UNSET = 0xFFFFFFFF
+# --- Rectangles this thin are filled in point by point ----------------------
+DEF MIN_RECT = 4
 
 #-----------------------------------------------------------------------------
 # Cython functions
 #-----------------------------------------------------------------------------
-cdef real_t abs_sq(real_t zr, real_t zi) nogil:
+def openmp_info(int_t num_threads=0):
+    ''' Tells whether this module was compiled with OpenMP.
+
+    Returns a dict with the keys 'enabled', whether `prange` runs in
+    parallel; 'max_threads', the number of threads it uses by default; and
+    'threads', the number of threads actually started when `num_threads`
+    (default 'max_threads') are asked for.
+    '''
+    cdef:
+        int_t i, tid, threads = 0
+        char running[MAX_THREADS]
+
+    if num_threads < 1:
+        num_threads = omp_get_max_threads()
+    for i in range(MAX_THREADS):
+        running[i] = 0
+    with nogil, parallel(num_threads=num_threads):
+        tid = threadid()
+        if tid < MAX_THREADS:
+            running[tid] = 1
+    for i in range(MAX_THREADS):
+        threads += running[i]
+    return dict(enabled=JULIA_OPENMP,
+                max_threads=omp_get_max_threads(),
+                threads=threads)
+
+def choose_dtype(double spacing, double magnitude):
+    ''' Returns the NumPy floating point type to compute a grid of points
+    `spacing` apart with, whose coordinates are at most `magnitude`.
+
+    float32 is faster, but once neighbouring points are only a few float32
+    ulps apart, iterating them amplifies the rounding errors into visible
+    noise; then float64 is used instead.
+    '''
+    cdef double ulp = np.finfo(np.float32).eps * max(magnitude, 1.0)
+    if spacing > AUTO_FLOAT32_ULPS * ulp:
+        return np.float32
+    return np.float64
+
+cdef any_real_t abs_sq(any_real_t zr, any_real_t zi) noexcept nogil:
     return zr * zr + zi * zi
 
-cdef uint_t kernel(real_t zr, real_t zi,
-                   real_t cr, real_t ci,
-                   real_t lim, real_t cutoff) nogil:
+cdef uint_t escape_count(any_real_t zr, any_real_t zi,
+                         any_real_t cr, any_real_t ci,
+                         any_real_t lim, any_real_t cutoff) noexcept nogil:
     cdef:
         uint_t count = 0
-        real_t lim_sq = lim * lim
+        any_real_t lim_sq = lim * lim
         
     while abs_sq(zr, zi) < lim_sq and count < cutoff:
         zr, zi = zr * zr - zi * zi + cr, 2 * zr * zi + ci
         count += 1
     return count
 
+cpdef uint_t kernel(real_t zr, real_t zi,
+                    real_t cr, real_t ci,
+                    real_t lim, real_t cutoff) noexcept nogil:
+    return escape_count(zr, zi, cr, ci, lim, cutoff)
+
+cdef uint_t kernel_periodic(any_real_t zr, any_real_t zi,
+                            any_real_t cr, any_real_t ci,
+                            any_real_t lim, any_real_t cutoff,
+                            any_real_t tol) noexcept nogil:
+    # Same as `escape_count`, but compares each iterate against a saved one
+    # (Brent's cycle detection, saving every power-of-two steps); an orbit
+    # that comes back to within `tol` of the saved iterate is periodic and
+    # will never escape, so return straight away with the count
+    # `escape_count` would reach.
+    cdef:
+        uint_t count = 0, steps = 0, period = 1
+        any_real_t lim_sq = lim * lim
+        any_real_t tol_sq = tol * tol
+        any_real_t sr = zr, si = zi
+
+    while abs_sq(zr, zi) < lim_sq and count < cutoff:
+        zr, zi = zr * zr - zi * zi + cr, 2 * zr * zi + ci
+        count += 1
+        if abs_sq(zr - sr, zi - si) < tol_sq:
+            return <uint_t>ceil(cutoff)
+        steps += 1
+        if steps == period:
+            sr, si = zr, zi
+            steps = 0
+            period *= 2
+    return count
+
+cdef double smooth_count(any_real_t zr, any_real_t zi,
+                         any_real_t cr, any_real_t ci,
+                         any_real_t lim, any_real_t cutoff) noexcept nogil:
+    # The normalised iteration count: `escape_count`, plus a fractional part
+    # from how far past `lim` the orbit lands on escaping, so that it varies
+    # continuously over the plane instead of in steps.  Points that never
+    # escape get `cutoff`.
+    cdef:
+        uint_t count = 0
+        any_real_t lim_sq = lim * lim
+        double mu
+
+    while abs_sq(zr, zi) < lim_sq and count < cutoff:
+        zr, zi = zr * zr - zi * zi + cr, 2 * zr * zi + ci
+        count += 1
+    if count >= cutoff:
+        return cutoff
+    mu = count + 1 - log(log(abs_sq(zr, zi)) / (2 * log(lim))) / log(2.)
+    return min(max(mu, 0.), <double>cutoff)
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef inline void julia_point(uint_t[:,::1] counts, float[:,::1] smooth,
+                             uchar_t[:,:,::1] rgba, uchar_t[:,::1] lut,
+                             int_t i, int_t j, any_real_t zr, any_real_t zi,
+                             any_real_t cr, any_real_t ci,
+                             any_real_t lim, any_real_t cutoff,
+                             bint periodicity, any_real_t period_tol,
+                             double scale, int_t last) noexcept nogil:
+    # Computes the point `zr` + `zi`i into element (i, j) of whichever of the
+    # outputs is not None: the escape `counts`, the `smooth` counts, or the
+    # `rgba` image of the smooth counts through the colour table `lut`, with
+    # `scale` and `last` as set up by `julia_grid`.
+    cdef:
+        int_t k
+        double mu
+
+    if counts is not None:
+        if periodicity:
+            counts[i,j] = kernel_periodic(zr, zi, cr, ci,
+                                          lim, cutoff, period_tol)
+        else:
+            counts[i,j] = escape_count(zr, zi, cr, ci, lim, cutoff)
+        return
+    mu = smooth_count(zr, zi, cr, ci, lim, cutoff)
+    if smooth is not None:
+        smooth[i,j] = <float>mu
+        return
+    # Colour on a log scale, as the counts span orders of magnitude.
+    k = min(<int_t>(log1p(mu) * scale), last)
+    rgba[i,j,0] = lut[k,0]
+    rgba[i,j,1] = lut[k,1]
+    rgba[i,j,2] = lut[k,2]
+    rgba[i,j,3] = lut[k,3]
+
 @cython.boundscheck(False)
 @cython.wraparound(False)
-def compute_julia(real_t cr, real_t ci,
-                  uint32_t N, real_t bound=1.5,
-                  real_t lim=1000., real_t cutoff=1e6):
+cdef void julia_grid(uint_t[:,::1] counts, float[:,::1] smooth,
+                     uchar_t[:,:,::1] rgba, uchar_t[:,::1] lut,
+                     any_real_t[::1] xs, any_real_t[::1] ys,
+                     any_real_t cr, any_real_t ci,
+                     any_real_t lim, any_real_t cutoff,
+                     bint periodicity, any_real_t period_tol,
+                     int_t num_threads, int_t tile_size) noexcept nogil:
+    # Computes the Julia set for the points `xs[i]` + `ys[j]`i into the
+    # outputs, as `julia_point` does, in parallel on `num_threads` threads:
+    # over the rows, or, if `tile_size` is positive, over square tiles of
+    # that size, handed out with dynamic scheduling.
+    cdef:
+        int_t i, j, t, i0, j0, w = xs.shape[0], h = ys.shape[0], last = 0
+        int_t tiles_w, tiles_h
+        double scale = 0
+
+    if rgba is not None:
+        last = lut.shape[0] - 1
+        scale = last / log1p(cutoff)
+    if tile_size < 1:
+        for i in prange(w, num_threads=num_threads):
+            for j in range(h):
+                julia_point(counts, smooth, rgba, lut, i, j, xs[i], ys[j],
+                            cr, ci, lim, cutoff, periodicity, period_tol,
+                            scale, last)
+        return
+    tiles_w = (w + tile_size - 1) // tile_size
+    tiles_h = (h + tile_size - 1) // tile_size
+    for t in prange(tiles_w * tiles_h, schedule='dynamic',
+                    num_threads=num_threads):
+        i0 = (t // tiles_h) * tile_size
+        j0 = (t % tiles_h) * tile_size
+        for i in range(i0, min(i0 + tile_size, w)):
+            for j in range(j0, min(j0 + tile_size, h)):
+                julia_point(counts, smooth, rgba, lut, i, j, xs[i], ys[j],
+                            cr, ci, lim, cutoff, periodicity, period_tol,
+                            scale, last)
+
+cdef compute_julia_grid(julia, xs, ys, dtype,
+                        double cr, double ci, double lim, double cutoff,
+                        bint periodicity, double period_tol,
+                        int_t num_threads, lut=None, int_t tile_size=0):
+    # Runs the specialisation of `julia_grid` for `dtype`, with `xs` and `ys`
+    # converted to that type, writing to `julia` as set up by `julia_output`.
+    cdef:
+        uint_t[:,::1] counts = None
+        float[:,::1] smooth = None
+        uchar_t[:,:,::1] rgba = None
+        uchar_t[:,::1] lut_view = None
+        float[::1] xs_f, ys_f
+        double[::1] xs_d, ys_d
+        long double[::1] xs_g, ys_g
+
+    if lut is not None:
+        rgba, lut_view = julia, lut
+    elif julia.dtype == np.float32:
+        smooth = julia
+    else:
+        counts = julia
+
+    if dtype == np.float32:
+        xs_f = np.asarray(xs, dtype=np.float32)
+        ys_f = np.asarray(ys, dtype=np.float32)
+        with nogil:
+            julia_grid(counts, smooth, rgba, lut_view, xs_f, ys_f,
+                       <float>cr, <float>ci, <float>lim, <float>cutoff,
+                       periodicity, <float>period_tol, num_threads,
+                       tile_size)
+    elif dtype == np.float64:
+        xs_d = np.asarray(xs, dtype=np.float64)
+        ys_d = np.asarray(ys, dtype=np.float64)
+        with nogil:
+            julia_grid(counts, smooth, rgba, lut_view, xs_d, ys_d,
+                       cr, ci, lim, cutoff,
+                       periodicity, period_tol, num_threads,
+                       tile_size)
+    elif dtype == np.longdouble:
+        xs_g = np.asarray(xs, dtype=np.longdouble)
+        ys_g = np.asarray(ys, dtype=np.longdouble)
+        with nogil:
+            julia_grid(counts, smooth, rgba, lut_view, xs_g, ys_g,
+                       <long double>cr, <long double>ci,
+                       <long double>lim, <long double>cutoff,
+                       periodicity, <long double>period_tol, num_threads,
+                       tile_size)
+    else:
+        raise ValueError("unsupported dtype %r; use np.float32, np.float64, "
+                         "np.longdouble or 'auto'" % (dtype,))
+
+def julia_output(shape, smooth=False, lut=None, out=None):
+    ''' Returns the array for a Julia set computation of the given `shape` to
+    write to: the escape counts as uint32, or with `smooth`, the normalised
+    (continuous) counts as float32, or with a colour table `lut`, an RGBA
+    image as uint8.
+
+    `lut` is an (n, 4) uint8 array of colours, for counts from 0 to the
+    cutoff on a log scale.  If `out` is given, it is checked and returned
+    instead of allocating a new array.
+    '''
+    shape = tuple(shape)
+    if lut is not None:
+        if np.ndim(lut) != 2 or np.shape(lut)[1] != 4 or len(lut) == 0:
+            raise ValueError("lut must have shape (n, 4), got %r"
+                             % (np.shape(lut),))
+        shape, dtype = shape + (4,), np.uint8
+    elif smooth:
+        dtype = np.float32
+    else:
+        dtype = np.uint32
+    if out is None:
+        return np.empty(shape, dtype=dtype)
+    if out.shape != shape or out.dtype != dtype:
+        raise ValueError("out must be a %s array of shape %r, got %s %r"
+                         % (np.dtype(dtype).name, shape,
+                            out.dtype.name, out.shape))
+    return out
+
+def resolve_dtype(dtype, double spacing, double magnitude):
+    ''' Returns `dtype` as a NumPy scalar type, or `choose_dtype(spacing,
+    magnitude)` if `dtype` is 'auto'.
+    '''
+    if isinstance(dtype, str) and dtype == 'auto':
+        return choose_dtype(spacing, magnitude)
+    return np.dtype(dtype).type
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef void kernel_lanes(real_t zr, real_t *zis, uint_t *counts, int_t n,
+                       real_t cr, real_t ci,
+                       real_t lim, real_t cutoff) noexcept nogil:
+    # Computes `kernel(zr, zis[j], cr, ci, lim, cutoff)` for the `n` points
+    # of a grid row, writing the results to `counts`.
+    #
+    # The points are fed through LANES lanes that are iterated in lock-step
+    # with a per-lane mask instead of a data-dependent `while` loop, so the
+    # inner loop over the lanes is branch-free and can be vectorized by the C
+    # compiler.  Every RETIRE_EVERY steps, finished lanes are retired and
+    # refilled with the next point of the row.
+    cdef:
+        real_t lim_sq = lim * lim
+        real_t xr[LANES]
+        real_t xi[LANES]
+        int_t cnt[LANES]
+        int_t idx[LANES]
+        real_t tr, ti
+        int_t active
+        int_t k, s, nxt = 0, live = 0
+
+    for k in range(LANES):
+        cnt[k] = 0
+        if nxt < n:
+            xr[k], xi[k], idx[k] = zr, zis[nxt], nxt
+            nxt += 1
+            live += 1
+        else:
+            # An idle lane: starts (and stays) outside of `lim`.
+            xr[k], xi[k], idx[k] = lim, 0, -1
+
+    while live:
+        for s in range(RETIRE_EVERY):
+            for k in range(LANES):
+                active = ((abs_sq(xr[k], xi[k]) < lim_sq) &
+                          (cnt[k] < cutoff))
+                tr = xr[k] * xr[k] - xi[k] * xi[k] + cr
+                ti = 2 * xr[k] * xi[k] + ci
+                xr[k] = tr if active else xr[k]
+                xi[k] = ti if active else xi[k]
+                cnt[k] += active
+        for k in range(LANES):
+            if idx[k] < 0:
+                continue
+            if abs_sq(xr[k], xi[k]) < lim_sq and cnt[k] < cutoff:
+                continue
+            counts[idx[k]] = cnt[k]
+            cnt[k] = 0
+            if nxt < n:
+                xr[k], xi[k], idx[k] = zr, zis[nxt], nxt
+                nxt += 1
+            else:
+                xr[k], xi[k], idx[k] = lim, 0, -1
+                live -= 1
+
+def compute_julia(double cr, double ci,
+                  uint32_t N, double bound=1.5,
+                  double lim=1000., double cutoff=1e6,
+                  bint periodicity=False, double period_tol=1e-6,
+                  dtype=np.float32, smooth=False, lut=None, out=None):
+    ''' Julia set calculation for a given `c`.
+
+    The orbits are computed in `dtype`: np.float32, np.float64 or
+    np.longdouble, or 'auto' to let `choose_dtype` pick float32 or float64
+    depending on the grid spacing.
+
+    With `smooth` set, returns the normalised iteration counts as float32
+    rather than the escape counts; with a colour table `lut`, returns them
+    coloured as a uint8 RGBA image, written to `out` if given.  See
+    `julia_output`.  Periodicity checking only applies to the escape counts.
+    '''
+    julia = julia_output((N, N), smooth, lut, out)
+    dtype = resolve_dtype(dtype, 2 * bound / max(N - 1, 1), bound)
+    grid = np.linspace(-bound, bound, N).astype(dtype)
+    t0 = time()
+    compute_julia_grid(julia, grid, grid, dtype, cr, ci, lim, cutoff,
+                       periodicity, period_tol, 1, lut)
+    return julia, time() - t0
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def compute_julia_simd(real_t cr, real_t ci,
+                       uint_t N, real_t bound=1.5,
+                       real_t lim=1000., real_t cutoff=1e6):
+    ''' Julia set calculation using the lock-step `kernel_lanes` kernel; gives
+    the same result as `compute_julia`.
+    '''
     cdef:
         uint_t[:,::1] julia 
         real_t[::1] grid
-        int i, j
-        real_t x, y
-        
+        int_t i, n = N
+
     julia = np.empty((N, N), dtype=np.uint32)
     grid = np.asarray(np.linspace(-bound, bound, N), dtype=np.float32)
     t0 = time()
-    for i in range(N):
-        x = grid[i]
-        for j in range(N):
-            y = grid[j]
-            julia[i,j] = kernel(x, y, cr, ci, lim, cutoff)
+    if n:
+        with nogil:
+            for i in range(n):
+                kernel_lanes(grid[i], &grid[0], &julia[i,0], n,
+                             cr, ci, lim, cutoff)
+    return julia, time() - t0
+
+def compute_julia_parallel(double cr, double ci,
+                           uint_t N, double bound=1.5,
+                           double lim=1000., double cutoff=1e6,
+                           bint periodicity=False, double period_tol=1e-6,
+                           int_t num_threads=0, dtype=np.float32,
+                           smooth=False, lut=None, out=None):
+    ''' Same as `compute_julia`, but computing the rows in parallel on
+    `num_threads` threads (default OpenMP's number of threads).
+    '''
+    if num_threads < 1:
+        num_threads = omp_get_max_threads()
+
+    julia = julia_output((N, N), smooth, lut, out)
+    dtype = resolve_dtype(dtype, 2 * bound / max(N - 1, 1), bound)
+    grid = np.linspace(-bound, bound, N).astype(dtype)
+    t0 = time()
+    compute_julia_grid(julia, grid, grid, dtype, cr, ci, lim, cutoff,
+                       periodicity, period_tol, num_threads, lut)
+    return julia, time() - t0
+
+def compute_julia_tiled(double cr, double ci,
+                        uint_t N, double bound=1.5,
+                        double lim=1000., double cutoff=1e6,
+                        bint periodicity=False, double period_tol=1e-6,
+                        int_t num_threads=0, dtype=np.float32,
+                        smooth=False, lut=None, out=None, int_t tile_size=32):
+    ''' Same as `compute_julia_parallel`, but over square `tile_size` x
+    `tile_size` tiles of the grid instead of rows.
+
+    Tiles are handed out to the threads with dynamic scheduling, so threads
+    that land on cheap, quickly-escaping tiles go back for more work instead
+    of idling behind the tiles near the set's boundary.
+    '''
+    if tile_size < 1:
+        raise ValueError("tile_size must be positive, got %d" % tile_size)
+    if num_threads < 1:
+        num_threads = omp_get_max_threads()
+
+    julia = julia_output((N, N), smooth, lut, out)
+    dtype = resolve_dtype(dtype, 2 * bound / max(N - 1, 1), bound)
+    grid = np.linspace(-bound, bound, N).astype(dtype)
+    t0 = time()
+    compute_julia_grid(julia, grid, grid, dtype, cr, ci, lim, cutoff,
+                       periodicity, period_tol, num_threads, lut, tile_size)
+    return julia, time() - t0
+
+def compute_julia_viewport(double cr, double ci,
+                           double x0, double x1, double y0, double y1,
+                           uint_t width, uint_t height,
+                           double lim=1000., double cutoff=1e6,
+                           int_t num_threads=0, dtype='auto',
+                           smooth=False, lut=None, out=None):
+    ''' Parallel Julia set calculation over the rectangle [`x0`, `x1`] x
+    [`y0`, `y1`] of the complex plane, sampled at the centres of a `width` x
+    `height` grid of pixels.
+
+    `julia[i, j]` is the escape count of the centre of pixel (i, j), whose
+    real part increases with `i` and imaginary part with `j`.  Since pixel
+    centres are used, adjacent viewports can be tiled without overlap.  By
+    default, the orbits are computed in double precision once the pixels are
+    too small for single precision; see `compute_julia`, also for `smooth`,
+    `lut` and `out`.
+    '''
+    if num_threads < 1:
+        num_threads = omp_get_max_threads()
+
+    julia = julia_output((width, height), smooth, lut, out)
+    dx, dy = (x1 - x0) / max(width, 1), (y1 - y0) / max(height, 1)
+    dtype = resolve_dtype(dtype, min(dx, dy),
+                          max(abs(x0), abs(x1), abs(y0), abs(y1)))
+    xs = x0 + (np.arange(width) + 0.5) * dx
+    ys = y0 + (np.arange(height) + 0.5) * dy
+    t0 = time()
+    compute_julia_grid(julia, xs, ys, dtype, cr, ci, lim, cutoff,
+                       False, 0, num_threads, lut)
     return julia, time() - t0
 
 @cython.boundscheck(False)
 @cython.wraparound(False)
-def compute_julia_parallel(real_t cr, real_t ci,
-                           uint_t N, real_t bound=1.5,
-                           real_t lim=1000., real_t cutoff=1e6):
+def compute_julia_batch(cs, uint_t N, real_t bound=1.5,
+                        real_t lim=1000., real_t cutoff=1e6,
+                        int_t num_threads=0, out=None):
+    ''' Julia set calculation for each of the c values in `cs`, returning a
+    `(len(cs), N, N)` stack of the results; `julia[k]` is the same as
+    `compute_julia(cs[k].real, cs[k].imag, N, ...)`.
+
+    The grid is set up once, and the (c value, row) pairs are shared out
+    between `num_threads` threads (OpenMP's default number of threads if
+    `num_threads` is 0) with dynamic scheduling, so a batch keeps all the
+    threads busy even when each grid is small.  The results are written to
+    `out` if given, which must be a C-contiguous uint32 array of the right
+    shape.
+    '''
     cdef:
-        uint_t[:,::1] julia 
+        uint_t[:,:,::1] julia
+        real_t[::1] grid, crs, cis
+        int_t i, j, k, r, n = N, nc
+
+    cs = np.asarray(cs, dtype=np.complex128)
+    if cs.ndim != 1:
+        raise ValueError("cs must be one-dimensional, got shape %r"
+                         % (cs.shape,))
+    nc = cs.shape[0]
+    if out is None:
+        out = np.empty((nc, N, N), dtype=np.uint32)
+    elif out.shape != (nc, N, N):
+        raise ValueError("out must have shape %r, got %r"
+                         % ((nc, N, N), out.shape))
+    if num_threads < 1:
+        num_threads = omp_get_max_threads()
+
+    julia = out
+    grid = np.asarray(np.linspace(-bound, bound, N), dtype=np.float32)
+    crs = np.ascontiguousarray(cs.real, dtype=np.float32)
+    cis = np.ascontiguousarray(cs.imag, dtype=np.float32)
+    t0 = time()
+    for r in prange(nc * n, nogil=True, schedule='dynamic',
+                    num_threads=num_threads):
+        k = r // n
+        i = r % n
+        for j in range(n):
+            julia[k,i,j] = kernel(grid[i], grid[j], crs[k], cis[k],
+                                  lim, cutoff)
+    return out, time() - t0
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef uint_t subdivide_point(uint_t[:,::1] julia, real_t[::1] grid,
+                            int_t i, int_t j,
+                            real_t cr, real_t ci,
+                            real_t lim, real_t cutoff,
+                            int_t *evals) noexcept nogil:
+    # Returns the escape count at grid point (i, j), calling `kernel` only if
+    # it has not been computed already.
+    if julia[i,j] == <uint_t>UNSET:
+        julia[i,j] = kernel(grid[i], grid[j], cr, ci, lim, cutoff)
+        evals[0] += 1
+    return julia[i,j]
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef void subdivide(uint_t[:,::1] julia, real_t[::1] grid,
+                    int_t i0, int_t i1, int_t j0, int_t j1,
+                    real_t cr, real_t ci,
+                    real_t lim, real_t cutoff,
+                    int_t *evals) noexcept nogil:
+    # Fills in the rectangle with corners (i0, j0) and (i1, j1), inclusive.
+    cdef:
+        int_t i, j, mid
+        uint_t value = subdivide_point(julia, grid, i0, j0,
+                                       cr, ci, lim, cutoff, evals)
+        bint uniform = True
+
+    # The whole border is computed even once it is known not to be uniform:
+    # the sub-rectangles share it.
+    for j in range(j0, j1 + 1):
+        if subdivide_point(julia, grid, i0, j,
+                           cr, ci, lim, cutoff, evals) != value:
+            uniform = False
+        if subdivide_point(julia, grid, i1, j,
+                           cr, ci, lim, cutoff, evals) != value:
+            uniform = False
+    for i in range(i0 + 1, i1):
+        if subdivide_point(julia, grid, i, j0,
+                           cr, ci, lim, cutoff, evals) != value:
+            uniform = False
+        if subdivide_point(julia, grid, i, j1,
+                           cr, ci, lim, cutoff, evals) != value:
+            uniform = False
+
+    if i1 - i0 < 2 or j1 - j0 < 2:
+        # No interior points left.
+        return
+    if uniform:
+        for i in range(i0 + 1, i1):
+            for j in range(j0 + 1, j1):
+                julia[i,j] = value
+    elif i1 - i0 <= MIN_RECT and j1 - j0 <= MIN_RECT:
+        for i in range(i0 + 1, i1):
+            for j in range(j0 + 1, j1):
+                subdivide_point(julia, grid, i, j,
+                                cr, ci, lim, cutoff, evals)
+    elif i1 - i0 >= j1 - j0:
+        mid = (i0 + i1) // 2
+        subdivide(julia, grid, i0, mid, j0, j1, cr, ci, lim, cutoff, evals)
+        subdivide(julia, grid, mid, i1, j0, j1, cr, ci, lim, cutoff, evals)
+    else:
+        mid = (j0 + j1) // 2
+        subdivide(julia, grid, i0, i1, j0, mid, cr, ci, lim, cutoff, evals)
+        subdivide(julia, grid, i0, i1, mid, j1, cr, ci, lim, cutoff, evals)
+
+def compute_julia_subdivide(real_t cr, real_t ci,
+                            uint_t N, real_t bound=1.5,
+                            real_t lim=1000., real_t cutoff=1e6,
+                            stats=None):
+    ''' Julia set calculation by recursive rectangle subdivision (the
+    Mariani-Silver algorithm).
+
+    Only the border of each rectangle is computed; if every point on it has
+    the same escape count, the rectangle is filled with that count, otherwise
+    it is split in two and each half handled the same way.  This relies on
+    the regions of constant escape count being connected, so it can miss
+    small features that lie entirely inside a rectangle -- e.g. for Julia
+    sets that are Cantor dust.
+
+    If given a dict as `stats`, stores the number of `kernel` evaluations
+    made and saved under the 'evaluations' and 'saved' keys.
+    '''
+    cdef:
+        uint_t[:,::1] julia
         real_t[::1] grid
-        int_t i, j
-        real_t x
+        int_t evals = 0
+        int_t n = N
 
-    julia = np.empty((N, N), dtype=np.uint32)
+    julia = np.full((N, N), UNSET, dtype=np.uint32)
     grid = np.asarray(np.linspace(-bound, bound, N), dtype=np.float32)
     t0 = time()
-    for i in prange(N, nogil=True):
-        x = grid[i]
-        for j in range(N):
-            julia[i,j] = kernel(x, grid[j], cr, ci, lim, cutoff)
-    return julia, time() - t0
+    if n:
+        with nogil:
+            subdivide(julia, grid, 0, n - 1, 0, n - 1,
+                      cr, ci, lim, cutoff, &evals)
+    runtime = time() - t0
+    if stats is not None:
+        stats['evaluations'] = evals
+        stats['saved'] = n * n - evals
+    return julia, runtime
@@ -0,0 +1,103 @@
+#-----------------------------------------------------------------------------
+# Copyright (c) 2012, 2013, Enthought, Inc.
+# All rights reserved.  See LICENSE.txt for details.
+#-----------------------------------------------------------------------------
+
+'''
+julia_multiprocessing_solution.py
+
+Compute the Julia set with a pool of worker processes.
+
+The pool is created on first use and kept around, so repeated calls (e.g. from
+the interactive explorer in `julia_ui.py`) do not pay the process start-up
+cost each time.  The workers write their rows straight into an array in
+shared memory, so no results are pickled and sent back to the parent.
+'''
+
+import atexit
+import ctypes
+from multiprocessing import Pool, cpu_count
+from multiprocessing.sharedctypes import RawArray
+from time import time
+
+import numpy as np
+
+import julia_pure_python
+
+# --- Module state: the pool and the shared output buffer it writes into -----
+_pool = None
+_nprocs = None
+_shared = None
+
+# --- Worker-side view of the shared output buffer ---------------------------
+_julia = None
+
+def _init_worker(shared):
+    ''' Pool initializer; gives each worker a NumPy view of `shared`. '''
+    global _julia
+    _julia = np.frombuffer(shared, dtype=np.uint32)
+
+def _compute_rows(args):
+    ''' Computes rows `start` to `stop` of the Julia set into the shared
+    buffer.
+    '''
+    kernel, cr, ci, N, bound, lim, cutoff, start, stop = args
+    grid = np.linspace(-bound, bound, N)
+    for i in range(start, stop):
+        x = grid[i]
+        row = _julia[i * N:(i + 1) * N]
+        for j, y in enumerate(grid):
+            row[j] = kernel(x, y, cr, ci, lim, cutoff)
+
+def close_pool():
+    ''' Shuts down the worker pool, if any; it is restarted on the next call
+    to `compute_julia_block`.
+    '''
+    global _pool, _nprocs, _shared
+    if _pool is not None:
+        _pool.terminate()
+        _pool.join()
+    _pool = _nprocs = _shared = None
+
+atexit.register(close_pool)
+
+def get_pool(size, nprocs=None):
+    ''' Returns the worker pool and the shared buffer it writes into, with
+    room for at least `size` results.
+
+    The existing pool is reused unless its buffer is too small or a different
+    number of processes, `nprocs` (default: the number of CPUs), is asked for.
+    '''
+    global _pool, _nprocs, _shared
+    nprocs = nprocs or cpu_count()
+    if _pool is None or nprocs != _nprocs or len(_shared) < size:
+        if _shared is not None:
+            size = max(size, len(_shared))
+        close_pool()
+        _shared = RawArray(ctypes.c_uint32, size)
+        _pool = Pool(nprocs, initializer=_init_worker, initargs=(_shared,))
+        _nprocs = nprocs
+    return _pool, _shared
+
+def compute_julia_block(cr, ci, N, bound=1.5, lim=1000., cutoff=1e6,
+                        kernel=julia_pure_python.kernel, nprocs=None,
+                        block_size=None):
+    ''' Calculation of the Julia set for a given `c`, farming out blocks of
+    `block_size` rows to `nprocs` worker processes.
+
+    `kernel` is called as in `julia_pure_python.compute_julia` and has to be
+    picklable, i.e. a module level function.  By default, each worker gets
+    several blocks to even out the differences in runtime between rows.
+    '''
+    pool, shared = get_pool(N * N, nprocs)
+    if block_size is None:
+        block_size = max(1, N // (8 * _nprocs))
+    tasks = [(kernel, cr, ci, N, bound, lim, cutoff,
+              start, min(start + block_size, N))
+             for start in range(0, N, block_size)]
+    t0 = time()
+    pool.map(_compute_rows, tasks)
+    runtime = time() - t0
+    julia = np.frombuffer(shared, dtype=np.uint32, count=N * N)
+    # The buffer is reused by the next call, so return a copy.
+    return julia.reshape(N, N).copy(), runtime
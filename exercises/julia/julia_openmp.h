@@ -0,0 +1,15 @@
+#ifndef _JULIA_OPENMP_H_
+#define _JULIA_OPENMP_H_
+
+/* Lets the Julia extension modules ask whether they were compiled with
+ * OpenMP, and how many threads it would use, without requiring OpenMP. */
+
+#ifdef _OPENMP
+#include <omp.h>
+#define JULIA_OPENMP 1
+#else
+#define JULIA_OPENMP 0
+static int omp_get_max_threads(void) { return 1; }
+#endif
+
+#endif
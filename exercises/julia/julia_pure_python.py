@@ -12,9 +12,10 @@ def kernel(zr, zi, cr, ci, lim, cutoff):
         count += 1
     return count
 
-def compute_julia(cr, ci, N, bound=1.5, lim=1000., cutoff=1e6):
+def compute_julia(cr, ci, N, bound=1.5, lim=1000., cutoff=1e6, kernel=kernel):
     ''' Pure Python calculation of the Julia set for a given `c`.  No NumPy
-        array operations are used.
+        array operations are used.  A different `kernel` may be given, e.g.
+        `julia_cython_solution.kernel`.
     '''
     julia = np.empty((N, N), dtype=np.uint32)
     grid_x = np.linspace(-bound, bound, N)
@@ -0,0 +1,58 @@
+#-----------------------------------------------------------------------------
+# Copyright (c) 2012, 2013, Enthought, Inc.
+# All rights reserved.  See LICENSE.txt for details.
+#-----------------------------------------------------------------------------
+
+from time import time
+import numpy as np
+
+def compute_julia(cr, ci, N, bound=1.5, lim=1000., cutoff=1e6):
+    ''' Pure Python calculation of the Julia set for a given `c` using NumPy
+    array operations.
+
+    Gives the same result as `julia_pure_python.compute_julia`.  Unlike
+    `julia_numpy.compute_julia`, only the points that have not escaped yet are
+    iterated: whenever points escape, the arrays of active points are
+    compacted.  The update is done in place, reusing a fixed set of scratch
+    buffers, and |z|**2 is compared against `lim`**2 to avoid the square root
+    in `np.abs`.
+    '''
+    julia = np.empty(N * N, dtype=np.uint32)
+    grid = np.linspace(-bound, bound, N)
+    lim_sq = lim * lim
+    t0 = time()
+    # The active points' z values and their (flattened) indices into `julia`.
+    zr = np.repeat(grid, N)
+    zi = np.tile(grid, N)
+    index = np.arange(N * N)
+    # Scratch buffers; only the first `n` entries are used.
+    zr_sq = np.empty(N * N)
+    zi_sq = np.empty(N * N)
+    mag_sq = np.empty(N * N)
+    escaped = np.empty(N * N, dtype=bool)
+    keep = np.empty(N * N, dtype=bool)
+    n = N * N
+    count = 0
+    while n:
+        np.multiply(zr, zr, out=zr_sq[:n])
+        np.multiply(zi, zi, out=zi_sq[:n])
+        np.add(zr_sq[:n], zi_sq[:n], out=mag_sq[:n])
+        np.greater_equal(mag_sq[:n], lim_sq, out=escaped[:n])
+        if escaped[:n].any():
+            julia[index[escaped[:n]]] = count
+            np.logical_not(escaped[:n], out=keep[:n])
+            index, zr, zi = index[keep[:n]], zr[keep[:n]], zi[keep[:n]]
+            zr_sq[:len(index)] = zr_sq[:n][keep[:n]]
+            zi_sq[:len(index)] = zi_sq[:n][keep[:n]]
+            n = len(index)
+        if not n or count >= cutoff:
+            break
+        # z = z**2 + c, in place.
+        np.multiply(zr, zi, out=zi)
+        zi *= 2
+        zi += ci
+        np.subtract(zr_sq[:n], zi_sq[:n], out=zr)
+        zr += cr
+        count += 1
+    julia[index] = count
+    return julia.reshape(N, N), time() - t0
@@ -1,13 +1,23 @@
 # --- Imports ----------------------------------------------------------------
+from threading import Thread, Lock
+from time import time
+
 import numpy as np
 
 from traits.api import (HasTraits, Float, Instance, Array, on_trait_change,
-                        Property, Int, Enum, Callable)
+                        Property, Int, Enum, Callable, Bool, Any, Tuple, Str)
+from pyface.api import GUI
 from traitsui.api import View, Item, RangeEditor, Controller, HGroup, Group
 from chaco import default_colormaps
-from chaco.api import Plot, ArrayPlotData, hot
+from chaco.api import Plot, ArrayPlotData, DataRange1D, hot
+from chaco.tools.api import PanTool, ZoomTool
 from enable.api import ComponentEditor
 import utils
+from cache import JuliaCache
+from viewport import TileStore
+
+# --- Fractions of the full resolution rendered in progressive mode ---------
+PROGRESSIVE_LEVELS = (8, 4, 2, 1)
 
 # --- Traits classes. --------------------------------------------------------
 
@@ -20,19 +30,118 @@ class Julia(HasTraits):
     runtime = Float()
     julia = Array()
     compute_julia = Callable()
+    # Render coarse-to-fine on a background thread rather than blocking.
+    progressive = Bool(False)
+    # Time until the coarsest level was shown, in progressive mode.
+    first_frame_time = Float()
+    # Bumped for every new render, so that stale renders can stop.
+    _generation = Int(0)
+    # Serializes calls to `compute_julia` from the render threads.
+    _lock = Any()
+    # If set, a `viewport.TileStore` that `compute` renders `viewport` from.
+    tiles = Any()
+    # The (x0, x1, y0, y1) rectangle of the complex plane to render.
+    viewport = Tuple(-2., 2., -2., 2.)
+    # Have `compute_julia` colour the Julia set itself, with `colormap`.
+    rgba = Bool(False)
+    colormap = Str('hot')
+    # The two RGBA images rendered into alternately, in `rgba` mode.
+    _buffers = Any()
     
-    @on_trait_change('cr, ci, resolution, cutoff')
+    @on_trait_change('cr, ci, resolution, cutoff, viewport')
     def update_julia(self):
-        self.julia = self.compute()
+        if self.progressive and self.tiles is None:
+            self.render_progressive()
+        else:
+            self.julia = self.compute()
         
     def _julia_default(self):
         return self.compute()
+
+    def __lock_default(self):
+        return Lock()
+
+    def __buffers_default(self):
+        return [None, None]
+
+    def _colormap_changed(self):
+        if self.rgba:
+            self.update_julia()
+
+    def image(self, cr, ci, N, cutoff, out=None):
+        ''' Computes the Julia set as an image: RGBA, coloured by
+        `compute_julia` in `rgba` mode, or else the log of the escape counts.
+        '''
+        if self.rgba:
+            return self.compute_julia(cr, ci, N, lim=4., cutoff=cutoff,
+                                      lut=colormap_lut(self.colormap),
+                                      out=out)
+        julia, runtime = self.compute_julia(cr, ci, N, lim=4., cutoff=cutoff)
+        return np.log(julia), runtime
+
+    def _next_buffer(self, N):
+        # Alternates between two buffers, so the one being displayed is not
+        # overwritten.
+        buffers = self._buffers
+        buffers.reverse()
+        if buffers[0] is None or buffers[0].shape[0] != N:
+            buffers[0] = np.empty((N, N, 4), dtype=np.uint8)
+        return buffers[0]
     
     def compute(self):
-        julia, self.runtime = self.compute_julia(self.cr, self.ci,
-                                                 self.resolution,
-                                                 lim=4., cutoff=self.cutoff)
-        return np.log(julia)
+        if self.tiles is not None:
+            x0, x1, y0, y1 = self.viewport
+            julia, self.runtime = self.tiles.render(self.cr, self.ci,
+                                                    x0, x1, y0, y1,
+                                                    self.resolution,
+                                                    self.resolution,
+                                                    cutoff=self.cutoff)
+            # Image rows are along the imaginary axis.
+            return np.log(julia.T)
+        out = self._next_buffer(self.resolution) if self.rgba else None
+        julia, self.runtime = self.image(self.cr, self.ci, self.resolution,
+                                         self.cutoff, out)
+        return julia
+
+    def render_progressive(self):
+        ''' Renders the Julia set at 1/8, 1/4, 1/2 and full resolution on a
+        background thread, updating `julia` as each level finishes.
+
+        Starting a new render cancels any render still in progress: it stops
+        after the level it is computing, and that level is not shown.
+        '''
+        self._generation += 1
+        args = (self._generation, self.cr, self.ci, self.resolution,
+                self.cutoff)
+        thread = Thread(target=self._render_levels, args=args)
+        thread.daemon = True
+        thread.start()
+
+    def _render_levels(self, generation, cr, ci, resolution, cutoff):
+        # Runs on the render thread; hands the levels to the GUI thread.
+        t0 = time()
+        for level in PROGRESSIVE_LEVELS:
+            with self._lock:
+                if generation != self._generation:
+                    return
+                N = max(resolution // level, 2)
+                julia, _ = self.image(cr, ci, N, cutoff)
+            # Nearest-neighbour upsampling to the full resolution.
+            if N != resolution:
+                index = np.arange(resolution) * N // resolution
+                julia = julia[index[:, np.newaxis], index]
+            GUI.invoke_later(self._show_level, generation, level, julia,
+                             time() - t0)
+
+    def _show_level(self, generation, level, julia, elapsed):
+        # Runs on the GUI thread.
+        if generation != self._generation:
+            return
+        if level == PROGRESSIVE_LEVELS[0]:
+            self.first_frame_time = elapsed
+        if level == PROGRESSIVE_LEVELS[-1]:
+            self.runtime = elapsed
+        self.julia = julia
 
 # --- Set up the colormaps to use --------------------------------------------
 def colormaps():
@@ -43,10 +152,21 @@ def colormaps():
     # Make 'hot' the first colormap.
     return ['hot'] + colormaps
 
+_luts = {}
+
+def colormap_lut(name, n=256):
+    ''' The colormap `name` as an (n, 4) uint8 colour table. '''
+    if (name, n) not in _luts:
+        cmap = default_colormaps.color_map_name_dict[name]
+        colors = cmap(DataRange1D(low=0., high=1.)).map_screen(
+                                                    np.linspace(0., 1., n))
+        _luts[name, n] = np.round(colors * 255).astype(np.uint8)
+    return _luts[name, n]
+
 class JuliaUI(Controller):
     
     model = Instance(Julia)
-    runtime = Property(depends_on=['model.runtime'])
+    runtime = Property(depends_on=['model.runtime', 'model.first_frame_time'])
     plot = Instance(Plot)
     colormap = Enum(colormaps())
     
@@ -67,24 +187,68 @@ class JuliaUI(Controller):
     
     @on_trait_change('model.runtime')
     def _get_runtime(self):
-        return "Compute time: {:d} ms".format(int(round(self.model.runtime * 1000)))
+        runtime = "Compute time: {:d} ms".format(int(round(self.model.runtime * 1000)))
+        if self.model.progressive:
+            runtime = "First frame: {:d} ms, final frame: {:d} ms".format(
+                    int(round(self.model.first_frame_time * 1000)),
+                    int(round(self.model.runtime * 1000)))
+        cache = getattr(self.model.compute_julia, 'cache', None)
+        if cache is not None:
+            runtime += " (cache hits: {hits}, misses: {misses})".format(**cache.stats())
+        return runtime
     
     @on_trait_change('model.julia')
     def update_julia(self):
         self.plot.data.set_data('julia', self.model.julia)
+        if self.model.tiles is not None:
+            x0, x1, y0, y1 = self.model.viewport
+            rows, cols = self.model.julia.shape
+            renderer = self.plot.plots['julia'][0]
+            renderer.index.set_data(np.linspace(x0, x1, cols + 1),
+                                    np.linspace(y0, y1, rows + 1))
+
+    def _viewport_changed(self):
+        # Called when the plot is panned or zoomed.
+        x_range, y_range = self.plot.range2d.x_range, self.plot.range2d.y_range
+        self.model.viewport = (x_range.low, x_range.high,
+                               y_range.low, y_range.high)
     
     def _plot_default(self):
         julia = self.model.julia
+        if self.model.tiles is not None:
+            return self._zoomable_plot()
         apd = ArrayPlotData(julia=julia[:-1,:-1])
         grid = np.linspace(-2, 2, self.model.resolution-1)
         X, Y = np.meshgrid(grid, grid)
         plot = Plot(apd)
         plot.aspect_ratio = 1.0
-        plot.img_plot("julia", xbounds=X, ybounds=Y,
-                      colormap=hot, interpolation='nearest')
+        if self.model.rgba:
+            plot.img_plot("julia", xbounds=X, ybounds=Y,
+                          interpolation='nearest')
+        else:
+            plot.img_plot("julia", xbounds=X, ybounds=Y,
+                          colormap=hot, interpolation='nearest')
+        return plot
+
+    def _zoomable_plot(self):
+        # A plot of the model's viewport that can be panned and zoomed, with
+        # the model re-rendering the newly visible region.
+        x0, x1, y0, y1 = self.model.viewport
+        plot = Plot(ArrayPlotData(julia=self.model.julia))
+        plot.aspect_ratio = 1.0
+        renderer, = plot.img_plot("julia", name='julia',
+                                  xbounds=(x0, x1), ybounds=(y0, y1),
+                                  colormap=hot, interpolation='nearest')
+        renderer.tools.append(PanTool(renderer))
+        renderer.overlays.append(ZoomTool(renderer, tool_mode='box',
+                                          always_on=False))
+        plot.range2d.on_trait_change(self._viewport_changed, 'updated')
         return plot
     
     def _colormap_changed(self):
+        if self.model.rgba:
+            self.model.colormap = self.colormap
+            return
         cmap = default_colormaps.color_map_name_dict[self.colormap]
         if self.plot is not None:
             value_range = self.plot.color_mapper.range
@@ -99,7 +263,15 @@ def main(args):
     if suffix in ('so', 'pyd', 'pyx'):
         utils.compiler(args.setup)
     compute_julia = utils.importer(args.module, args.function)
-    julia = Julia(compute_julia=compute_julia)
+    # The cache stores escape counts, not images.
+    if args.cache_mb > 0 and not args.rgba:
+        cache = JuliaCache(args.cache_mb * 2**20, args.cache_dir)
+        compute_julia = cache.wrap(compute_julia)
+    tiles = None
+    if args.tiles:
+        tiles = TileStore(utils.importer(args.module, 'compute_julia_viewport'))
+    julia = Julia(compute_julia=compute_julia, progressive=args.progressive,
+                  tiles=tiles, rgba=args.rgba and tiles is None)
     jui = JuliaUI(model=julia)
     jui.configure_traits()
 
@@ -109,4 +281,20 @@ if __name__ == '__main__':
     parser.add_argument('module')
     parser.add_argument('-f', '--function', default='compute_julia')
     parser.add_argument('--setup', default='setup.py')
+    parser.add_argument('--cache-mb', type=int, default=256,
+                        help="Memory for cached results in MB, 0 to disable.")
+    parser.add_argument('--cache-dir', help="Also keep cached results here.")
+    parser.add_argument('--progressive', action='store_true',
+                        help="Render coarse-to-fine without blocking the UI.")
+    parser.add_argument('--tiles', action='store_true',
+                        help="""Pan (drag) and zoom (mouse wheel, or 'z' and
+                        drag a box) into the Julia set, re-using the parts
+                        already computed.  The module must provide
+                        compute_julia_viewport.""")
+    parser.add_argument('--rgba', action='store_true',
+                        help="""Have the module colour the Julia set in the
+                        same pass as computing it, with smooth colouring.
+                        The function must take `lut` and `out` arguments, as
+                        julia_cython_solution.compute_julia does.  Disables
+                        the cache; ignored with --tiles.""")
     main(parser.parse_args())
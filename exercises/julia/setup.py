@@ -6,14 +6,55 @@
 # Date: 26 March 2012
 #-----------------------------------------------------------------------------
 
+import os
+import shutil
+import tempfile
+
 from distutils.core import setup
 from distutils.extension import Extension
+from distutils.ccompiler import new_compiler
+from distutils.sysconfig import customize_compiler
+from distutils.errors import CompileError, LinkError
 from Cython.Distutils import build_ext
 
-extra_args = []
-# Comment/Uncomment the following line to disable/enable OpenMP for GCC-ish
-# compilers.
-# extra_args = ["-fopenmp"]
+OPENMP_TEST = r"""
+#include <omp.h>
+#include <stdio.h>
+int main(void) {
+    #pragma omp parallel
+    printf("%d\n", omp_get_thread_num());
+    return 0;
+}
+"""
+
+def openmp_args():
+    ''' Returns the compiler (and linker) arguments that enable OpenMP, or an
+    empty list if the compiler does not support it.
+
+    Set the environment variable JULIA_NO_OPENMP to build without OpenMP.
+    '''
+    if os.environ.get('JULIA_NO_OPENMP'):
+        return []
+    compiler = new_compiler()
+    customize_compiler(compiler)
+    args = ['/openmp'] if compiler.compiler_type == 'msvc' else ['-fopenmp']
+    tmpdir = tempfile.mkdtemp()
+    try:
+        src = os.path.join(tmpdir, 'test_openmp.c')
+        with open(src, 'w') as fh:
+            fh.write(OPENMP_TEST)
+        objs = compiler.compile([src], output_dir=tmpdir, extra_postargs=args)
+        compiler.link_executable(objs, os.path.join(tmpdir, 'test_openmp'),
+                                 extra_postargs=args)
+    except (CompileError, LinkError):
+        print("OpenMP is not supported by the compiler; "
+              "prange will run serially.")
+        return []
+    finally:
+        shutil.rmtree(tmpdir)
+    return args
+
+extra_args = openmp_args()
 
 exts = [Extension("julia_cython", 
                   ["julia_cython.pyx"],
@@ -21,6 +62,7 @@ exts = [Extension("julia_cython",
                   extra_link_args=extra_args),
         Extension("julia_cython_solution",
                   ["julia_cython_solution.pyx"],
+                  depends=["julia_openmp.h"],
                   extra_compile_args=extra_args,
                   extra_link_args=extra_args),
         ]
@@ -0,0 +1,119 @@
+import numpy as np
+
+import utils
+utils.compiler('setup.py')
+
+import julia_pure_python
+import julia_cython_solution
+import julia_python_numpy_solution
+
+kwargs = dict(cr=-0.1, ci=0.651, N=60, bound=1.5, lim=4., cutoff=200)
+
+ref_julia, _ = julia_pure_python.compute_julia(**kwargs)
+
+numpy_julia, _ = julia_python_numpy_solution.compute_julia(**kwargs)
+assert np.all(ref_julia == numpy_julia)
+
+julia, _ = julia_cython_solution.compute_julia(**kwargs)
+julia = np.asarray(julia)
+
+# The Cython kernels use single precision, so a handful of points right on
+# the boundary of the set may escape an iteration earlier or later.
+assert np.mean(ref_julia != julia) < 0.01
+
+# ... but in double precision, the results are the same.
+double_julia, _ = julia_cython_solution.compute_julia(dtype=np.float64,
+                                                      **kwargs)
+assert np.all(ref_julia == np.asarray(double_julia))
+parallel_julia, _ = julia_cython_solution.compute_julia_parallel(
+                                        dtype=np.float64, **kwargs)
+assert np.all(ref_julia == np.asarray(parallel_julia))
+
+simd_julia, _ = julia_cython_solution.compute_julia_simd(**kwargs)
+assert np.mean(ref_julia != np.asarray(simd_julia)) < 0.01
+assert np.all(julia == np.asarray(simd_julia))
+
+tiled_julia, _ = julia_cython_solution.compute_julia_tiled(tile_size=7, **kwargs)
+assert np.all(julia == np.asarray(tiled_julia))
+# The tiled and row-parallel versions are interchangeable.
+for extra in [dict(dtype=np.float64), dict(smooth=True)]:
+    extra.update(kwargs)
+    tiled_julia, _ = julia_cython_solution.compute_julia_tiled(tile_size=7,
+                                                               **extra)
+    parallel_julia, _ = julia_cython_solution.compute_julia_parallel(**extra)
+    assert np.all(np.asarray(tiled_julia) == np.asarray(parallel_julia))
+
+# Periodicity checking must not change the result, even for a c value whose
+# filled Julia set has a large interior.
+kwargs.update(cr=-0.12, ci=0.75, cutoff=1e4)
+julia, _ = julia_cython_solution.compute_julia(**kwargs)
+periodic_julia, _ = julia_cython_solution.compute_julia(periodicity=True,
+                                                         **kwargs)
+assert np.all(np.asarray(julia) == np.asarray(periodic_julia))
+
+stats = {}
+subdivide_julia, _ = julia_cython_solution.compute_julia_subdivide(
+                                                stats=stats, **kwargs)
+assert np.all(np.asarray(julia) == np.asarray(subdivide_julia))
+assert stats['evaluations'] + stats['saved'] == kwargs['N']**2
+assert stats['saved'] > 0
+
+# A viewport whose pixel centres fall on the points of the square grid.
+N, bound = kwargs['N'], kwargs['bound']
+half = bound / (N - 1)
+viewport_julia, _ = julia_cython_solution.compute_julia_viewport(
+                        kwargs['cr'], kwargs['ci'],
+                        -bound - half, bound + half, -bound - half, bound + half,
+                        N, N, kwargs['lim'], kwargs['cutoff'])
+assert np.mean(np.asarray(julia) != np.asarray(viewport_julia)) < 0.01
+
+# The cache keys on the wrapped function's defaults and extra keywords.
+from cache import JuliaCache
+cache = JuliaCache()
+cached = cache.wrap(julia_cython_solution.compute_julia)
+first, _ = cached(-0.1, 0.651, 30)
+again, _ = cached(-0.1, 0.651, 30, 1.5, cutoff=1e6)
+assert cache.hits == 1 and again is first
+smooth, _ = cached(-0.1, 0.651, 30, smooth=True)
+assert cache.misses == 2 and smooth.dtype == np.float32
+
+# Rendering from tiles: panning only computes the newly exposed tiles.
+from viewport import TileStore
+tiles = TileStore(julia_cython_solution.compute_julia_viewport, tile_size=16)
+tiled, _ = tiles.render(-0.1, 0.651, -1., 1., -1., 1., 64, 64, cutoff=200)
+direct, _ = julia_cython_solution.compute_julia_viewport(
+                -0.1, 0.651, -1., 1., -1., 1., 64, 64, 4., 200)
+assert np.mean(tiled != np.asarray(direct)) < 0.01
+misses = tiles.cache.misses
+tiles.render(-0.1, 0.651, -0.75, 1.25, -1., 1., 64, 64, cutoff=200)
+assert tiles.cache.hits > 0
+assert tiles.cache.misses - misses < misses
+
+# A batch of c values gives the same results as one call per c value, and can
+# write into a caller-provided buffer.
+cs = [-0.1+0.651j, 0.285+0.01j, -0.4+0.6j]
+batch = np.zeros((len(cs), 30, 30), dtype=np.uint32)
+out, _ = julia_cython_solution.compute_julia_batch(cs, 30, 1.5, 4., 200,
+                                                   out=batch)
+assert out is batch
+for c, julia in zip(cs, batch):
+    single, _ = julia_cython_solution.compute_julia(c.real, c.imag, 30, 1.5,
+                                                    4., 200)
+    assert np.all(julia == np.asarray(single))
+
+# Smooth counts are within one iteration of the escape counts, and colouring
+# them writes an RGBA image into the buffer given.
+cr, ci, N = -0.1, 0.651, 40
+counts, _ = julia_cython_solution.compute_julia(cr, ci, N, 1.5, 4., 200)
+smooth, _ = julia_cython_solution.compute_julia(cr, ci, N, 1.5, 4., 200,
+                                                smooth=True)
+assert smooth.dtype == np.float32
+assert np.all(np.abs(smooth - np.asarray(counts)) <= 1)
+assert np.all(smooth[np.asarray(counts) == 200] == 200)
+lut = np.zeros((2, 4), dtype=np.uint8)
+lut[1] = 255
+rgba = np.empty((N, N, 4), dtype=np.uint8)
+image, _ = julia_cython_solution.compute_julia_parallel(cr, ci, N, 1.5, 4.,
+                                                        200, lut=lut, out=rgba)
+assert image is rgba
+assert np.all(rgba[np.asarray(counts) == 200] == 255)
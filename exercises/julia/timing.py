@@ -1,4 +1,5 @@
 import utils
+from cache import JuliaCache
 import pylab as pl
 import numpy as np
 
@@ -7,8 +8,12 @@ def main(args):
     if suffix in ('so', 'pyd', 'pyx'):
         utils.compiler(args.setup)
     compute_julia = utils.importer(args.module, args.function)
+    if args.cache_dir:
+        compute_julia = JuliaCache(directory=args.cache_dir).wrap(compute_julia)
     jla, time = compute_julia(args.cr, args.ci, args.N, 2.0, 4., args.cutoff)
     print "Compute time: %fs" % time
+    if args.cache_dir:
+        print "Cache hits: {hits}, misses: {misses}".format(**compute_julia.cache.stats())
     pl.imshow(np.log(jla), cmap=pl.cm.hot)
     pl.show()
 
@@ -24,4 +29,5 @@ if __name__ == '__main__':
     parser.add_argument('-ci', default=0.651, help='The imaginary component of the C parameter.')
     parser.add_argument('-N', default=200, help='The number of grid points to use.')
     parser.add_argument('--cutoff', default=10**3, help='The cutoff value, controls the image detail.')
+    parser.add_argument('--cache-dir', help='Cache results in this directory, reusing them on later runs.')
     main(parser.parse_args())
@@ -0,0 +1,91 @@
+#-----------------------------------------------------------------------------
+# Copyright (c) 2013, Enthought, Inc.
+# All rights reserved.  See LICENSE.txt for details.
+#-----------------------------------------------------------------------------
+
+'''
+viewport.py
+
+Render arbitrary rectangular viewports of the Julia set from cached tiles, so
+that panning and zooming only compute the parts of the plane not seen before.
+
+    >>> tiles = TileStore(julia_cython_solution.compute_julia_viewport)
+    >>> julia, runtime = tiles.render(-0.1, 0.651, -0.5, 0.5, 0., 1., 400, 400)
+'''
+
+from __future__ import division
+
+from math import ceil, floor, log
+from time import time
+
+import numpy as np
+
+from cache import JuliaCache
+
+class TileStore(object):
+    ''' Renders viewports from square tiles of `tile_size` x `tile_size`
+    pixels, computed with `compute_viewport` (called like
+    `julia_cython_solution.compute_julia_viewport`) and cached.
+
+    Tiles form a quadtree: at zoom level 0 a pixel is `base_pixel` wide, and
+    each level halves that.  A viewport is rendered from the tiles of the
+    coarsest level that is at least as fine as the viewport's pixels.  Tiles
+    are cached by (c, cutoff, lim, zoom level, tile index) in a `JuliaCache`
+    of at most `max_bytes`.
+    '''
+
+    def __init__(self, compute_viewport, tile_size=64, base_pixel=4. / 256,
+                 max_bytes=256 * 2**20):
+        self.compute_viewport = compute_viewport
+        self.tile_size = tile_size
+        self.base_pixel = base_pixel
+        self.cache = JuliaCache(max_bytes)
+
+    def zoom_level(self, pixel):
+        ''' Returns the zoom level whose pixels are at most `pixel` wide. '''
+        return int(ceil(log(self.base_pixel / pixel, 2) - 1e-9))
+
+    def tile(self, cr, ci, cutoff, lim, zoom, tx, ty):
+        ''' Returns tile (`tx`, `ty`) of zoom level `zoom`; it covers
+        [tx, tx + 1] x [ty, ty + 1] in units of the tile's width.
+        '''
+        key = ('tile', float(cr), float(ci), float(cutoff), float(lim),
+               zoom, tx, ty)
+        julia = self.cache.get(key)
+        if julia is None:
+            span = self.tile_size * self.base_pixel * 2.0**-zoom
+            julia, _ = self.compute_viewport(cr, ci,
+                                             tx * span, (tx + 1) * span,
+                                             ty * span, (ty + 1) * span,
+                                             self.tile_size, self.tile_size,
+                                             lim, cutoff)
+            julia = self.cache.put(key, julia)
+        return julia
+
+    def render(self, cr, ci, x0, x1, y0, y1, width, height, cutoff=1e3,
+               lim=4.):
+        ''' Returns the `width` x `height` image of the viewport [`x0`, `x1`]
+        x [`y0`, `y1`], indexed like the result of `compute_julia_viewport`,
+        and the time taken.
+        '''
+        t0 = time()
+        T = self.tile_size
+        zoom = self.zoom_level(min((x1 - x0) / width, (y1 - y0) / height))
+        pixel = self.base_pixel * 2.0**-zoom
+        span = T * pixel
+        tx0, tx1 = int(floor(x0 / span)), int(ceil(x1 / span))
+        ty0, ty1 = int(floor(y0 / span)), int(ceil(y1 / span))
+        mosaic = np.empty(((tx1 - tx0) * T, (ty1 - ty0) * T), dtype=np.uint32)
+        for tx in range(tx0, tx1):
+            for ty in range(ty0, ty1):
+                mosaic[(tx - tx0) * T:(tx - tx0 + 1) * T,
+                       (ty - ty0) * T:(ty - ty0 + 1) * T] = \
+                        self.tile(cr, ci, cutoff, lim, zoom, tx, ty)
+        # Pick the mosaic pixel under the centre of each viewport pixel.
+        xs = x0 + (np.arange(width) + 0.5) * ((x1 - x0) / width)
+        ys = y0 + (np.arange(height) + 0.5) * ((y1 - y0) / height)
+        i = np.clip(((xs - tx0 * span) / pixel).astype(int),
+                    0, mosaic.shape[0] - 1)
+        j = np.clip(((ys - ty0 * span) / pixel).astype(int),
+                    0, mosaic.shape[1] - 1)
+        return mosaic[i[:, np.newaxis], j], time() - t0
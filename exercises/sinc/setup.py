@@ -1,10 +1,12 @@
 from distutils.core import setup
 from distutils.extension import Extension
 from Cython.Distutils import build_ext
+import numpy as np
 
 exts = [
         Extension("sinc_kernel", ["sinc_kernel.pyx"]),
-        Extension("sinc_solution", ["sinc_solution.pyx"]),
+        Extension("sinc_solution", ["sinc_solution.pyx"],
+                  include_dirs=[np.get_include()]),
         ]
 
 setup(
@@ -0,0 +1,57 @@
+'''
+sinc_accuracy.py
+
+Compares the accuracy and speed of the sinc kernels with `math.sin(x) / x`,
+over the [-5 pi, 5 pi] range used in `test_sinc.py`.
+
+    $ python sinc_accuracy.py
+'''
+
+from __future__ import print_function
+
+import math
+import sys
+import timeit
+
+import numpy as np
+import pyximport
+
+setup_args = {'include_dirs': np.get_include()}
+if sys.platform == 'win32':
+    setup_args['options'] = {'build_ext': {'compiler': 'mingw32'}}
+pyximport.install(setup_args=setup_args)
+
+import sinc_solution
+
+def reference(x):
+    ''' math.sin(x) / x in double precision, at the points of `x`. '''
+    return np.array([math.sin(v) / v if v else 1.0 for v in x.tolist()])
+
+def errors(y, ref):
+    ''' The maximum absolute error of `y`, and the maximum relative error
+    away from the zeros of sinc, where it is ill-conditioned.
+    '''
+    abs_err = np.abs(y - ref)
+    big = np.abs(ref) > 1e-3
+    return abs_err.max(), (abs_err[big] / np.abs(ref[big])).max()
+
+def report(n=10**6, number=20):
+    x64 = np.linspace(-5 * np.pi, 5 * np.pi, n)
+    kernels = [
+        ('sinc_array', lambda x: sinc_solution.sinc_array(x)),
+        ('sinc_array fast', lambda x: sinc_solution.sinc_array(x, fast=True)),
+        ]
+    print("{:<20s} {:>8s} {:>12s} {:>12s} {:>10s}".format(
+          "kernel", "dtype", "max abs err", "max rel err", "time (s)"))
+    for dtype in (np.float64, np.float32):
+        x = x64.astype(dtype)
+        ref = reference(x)
+        for name, kernel in kernels:
+            abs_err, rel_err = errors(kernel(x), ref)
+            runtime = min(timeit.repeat(lambda: kernel(x), number=number,
+                                        repeat=3)) / number
+            print("{:<20s} {:>8s} {:>12.3g} {:>12.3g} {:>10.3g}".format(
+                  name, np.dtype(dtype).name, abs_err, rel_err, runtime))
+
+if __name__ == '__main__':
+    report()
@@ -1,6 +1,11 @@
 from math import sin
+import numpy as np
 
 def sinc_kernel(x):
     if -0.01 < x < 0.01:
         return 1.0
     return sin(x) / x
+
+def sinc_numpy(x):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(np.abs(x) < 0.01, 1.0, np.sin(x) / x)
@@ -1,6 +1,183 @@
-from libc.math cimport sin
+from libc.math cimport sin, floor, fabs
+cimport cython
+cimport numpy as cnp
+import numpy as np
+
+cnp.import_array()
+cnp.import_ufunc()
 
 cpdef double sinc_kernel(double x):
     if -0.01 < x < 0.01:
         return 1.0
     return sin(x) / x
+
+# --- Array versions ----------------------------------------------------------
+
+ctypedef fused real_t:
+    float
+    double
+
+cdef inline real_t sinc(real_t x) noexcept nogil:
+    if -0.01 < x < 0.01:
+        return 1.0
+    return sin(x) / x
+
+# --- Fast sinc ---------------------------------------------------------------
+# sin(r) / r for |r| <= pi/2, as a polynomial in r**2 fitted for the smallest
+# maximum relative error, about 7e-14.
+DEF S0 = 0.9999999999999364
+DEF S1 = -0.16666666666433066
+DEF S2 = 0.008333333318809836
+DEF S3 = -0.00019841266420892261
+DEF S4 = 2.75569327817283e-06
+DEF S5 = -2.502955465443763e-08
+DEF S6 = 1.540172360377849e-10
+DEF INV_PI = 0.3183098861837907
+# pi split into the nearest double (float) and the remainder, so that k * pi
+# is subtracted without losing the low bits of the result.
+DEF PI_HI = 3.141592653589793
+DEF PI_LO = 1.2246467991473532e-16
+DEF PI_HI_F = 3.1415927410125732
+DEF PI_LO_F = -8.742278e-08
+# 1024 pi: fast_sinc uses the polynomial for |x| up to this.
+DEF FAST_MAX = 3216.990877275948
+
+cdef inline real_t fast_sinc(real_t x) noexcept nogil:
+    # With x = k pi + r, |r| <= pi/2: sin(x) = (-1)**k sin(r), and sin(r) is
+    # r times the polynomial.  Near zero (k == 0), the polynomial is sinc(x)
+    # itself, so no cutoff or division is needed there.  Beyond FAST_MAX
+    # (and for inf and nan), the reduction loses too many bits and k may not
+    # fit in a long, so sin(x) / x is used instead.
+    cdef real_t k, r, r2, p
+    if not fabs(x) <= FAST_MAX:
+        return sinc(x)
+    k = floor(x * <real_t>INV_PI + <real_t>0.5)
+    if real_t is float:
+        r = (x - k * <float>PI_HI_F) - k * <float>PI_LO_F
+    else:
+        r = (x - k * PI_HI) - k * PI_LO
+    r2 = r * r
+    p = <real_t>S0 + r2 * (<real_t>S1 + r2 * (<real_t>S2 + r2 * (<real_t>S3 +
+        r2 * (<real_t>S4 + r2 * (<real_t>S5 + r2 * <real_t>S6)))))
+    if k == 0:
+        return p
+    if <long>k & 1:
+        r = -r
+    return r * p / x
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef void sinc_loop(real_t[:] x, real_t[:] out, bint fast) noexcept nogil:
+    cdef Py_ssize_t i
+    if fast:
+        for i in range(x.shape[0]):
+            out[i] = fast_sinc(x[i])
+    else:
+        for i in range(x.shape[0]):
+            out[i] = sinc(x[i])
+
+def sinc_array(x, out=None, fast=False):
+    '''
+    sinc_array(x, out=None, fast=False) -> sin(x) / x for each element of the
+    1-D array x
+
+    Works on float32 and float64 arrays, with any strides; other inputs are
+    converted to float64.  The result is written to `out` if given, which
+    must have the same length and dtype as `x`.
+
+    With `fast`, uses a polynomial instead of `sin`, and has no cutoff near
+    zero.  For |x| <= 5 pi, its relative error is below 1e-13 in float64, and
+    its absolute error is about 2e-7 in float32.  Run `sinc_accuracy.py` for
+    the details.  For |x| > 1024 pi, and for inf and nan, it falls back to
+    sin(x) / x.
+    '''
+    x = np.asarray(x)
+    if x.dtype != np.float32:
+        x = x.astype(np.float64, copy=False)
+    if out is None:
+        out = np.empty_like(x)
+    elif out.dtype != x.dtype or out.shape != x.shape:
+        raise ValueError("out must be a %s array of shape %r"
+                         % (x.dtype.name, x.shape))
+    cdef float[:] xf, outf
+    cdef double[:] xd, outd
+    cdef bint use_fast = fast
+    if x.dtype == np.float32:
+        xf, outf = x, out
+        with nogil:
+            sinc_loop(xf, outf, use_fast)
+    else:
+        xd, outd = x, out
+        with nogil:
+            sinc_loop(xd, outd, use_fast)
+    return out
+
+# --- The ufunc ---------------------------------------------------------------
+# NumPy calls the inner loops with the GIL released, on 1-D strided runs of
+# the (broadcast) inputs.
+
+cdef void sinc_loop_f(char **args, const cnp.npy_intp *dims,
+                      const cnp.npy_intp *steps, void *data) noexcept nogil:
+    cdef:
+        cnp.npy_intp i
+        char *x = args[0]
+        char *y = args[1]
+    for i in range(dims[0]):
+        (<float *>y)[0] = sinc((<float *>x)[0])
+        x += steps[0]
+        y += steps[1]
+
+cdef void sinc_loop_d(char **args, const cnp.npy_intp *dims,
+                      const cnp.npy_intp *steps, void *data) noexcept nogil:
+    cdef:
+        cnp.npy_intp i
+        char *x = args[0]
+        char *y = args[1]
+    for i in range(dims[0]):
+        (<double *>y)[0] = sinc((<double *>x)[0])
+        x += steps[0]
+        y += steps[1]
+
+cdef void fast_sinc_loop_f(char **args, const cnp.npy_intp *dims,
+                           const cnp.npy_intp *steps,
+                           void *data) noexcept nogil:
+    cdef:
+        cnp.npy_intp i
+        char *x = args[0]
+        char *y = args[1]
+    for i in range(dims[0]):
+        (<float *>y)[0] = fast_sinc((<float *>x)[0])
+        x += steps[0]
+        y += steps[1]
+
+cdef void fast_sinc_loop_d(char **args, const cnp.npy_intp *dims,
+                           const cnp.npy_intp *steps,
+                           void *data) noexcept nogil:
+    cdef:
+        cnp.npy_intp i
+        char *x = args[0]
+        char *y = args[1]
+    for i in range(dims[0]):
+        (<double *>y)[0] = fast_sinc((<double *>x)[0])
+        x += steps[0]
+        y += steps[1]
+
+cdef cnp.PyUFuncGenericFunction sinc_loops[2]
+cdef cnp.PyUFuncGenericFunction fast_sinc_loops[2]
+cdef void *sinc_data[2]
+cdef char sinc_types[4]
+
+sinc_loops[0], sinc_loops[1] = sinc_loop_f, sinc_loop_d
+fast_sinc_loops[0], fast_sinc_loops[1] = fast_sinc_loop_f, fast_sinc_loop_d
+sinc_data[0], sinc_data[1] = NULL, NULL
+sinc_types[0], sinc_types[1] = cnp.NPY_FLOAT, cnp.NPY_FLOAT
+sinc_types[2], sinc_types[3] = cnp.NPY_DOUBLE, cnp.NPY_DOUBLE
+
+sinc_ufunc = cnp.PyUFunc_FromFuncAndData(
+        sinc_loops, sinc_data, sinc_types, 2, 1, 1, cnp.PyUFunc_None,
+        "sinc_ufunc", "sinc_ufunc(x) -> sin(x) / x, elementwise.", 0)
+
+fast_sinc_ufunc = cnp.PyUFunc_FromFuncAndData(
+        fast_sinc_loops, sinc_data, sinc_types, 2, 1, 1, cnp.PyUFunc_None,
+        "fast_sinc_ufunc", "fast_sinc_ufunc(x) -> sin(x) / x, elementwise, "
+        "with a polynomial; see sinc_array.", 0)
@@ -3,9 +3,9 @@ import timeit
 import pyximport
 import sys
 
-setup_args = {}
+setup_args = {'include_dirs': np.get_include()}
 if sys.platform == 'win32':
-    setup_args={'options': {'build_ext': {'compiler': 'mingw32'}}}
+    setup_args['options'] = {'build_ext': {'compiler': 'mingw32'}}
 pyximport.install(setup_args=setup_args)
 
 import sinc_python
@@ -18,6 +18,21 @@ sinc_cy_soln = np.vectorize(sinc_solution.sinc_kernel)
 
 x = np.linspace(-5*np.pi, 5*np.pi, 1000)
 
+expected = sinc_cy_soln(x)
+assert np.all(sinc_solution.sinc_array(x) == expected)
+assert np.all(sinc_solution.sinc_ufunc(x) == expected)
+assert np.allclose(sinc_python.sinc_numpy(x), expected)
+assert np.max(np.abs(sinc_solution.sinc_array(x, fast=True) -
+                     np.sin(x) / x)) < 1e-12
+# Outside the polynomial's range, the fast version is sin(x) / x.
+big = np.array([np.inf, -np.inf, np.nan, 1e300, -5e3])
+assert np.array_equal(sinc_solution.sinc_array(big, fast=True),
+                      sinc_solution.sinc_array(big), equal_nan=True)
+
 print "Python time:", timeit.timeit('sinc_py(x)', 'from __main__ import sinc_py,x', number=100)
 print "Cython time:", timeit.timeit('sinc_cy(x)', 'from __main__ import sinc_cy,x', number=100)
 print "Solution time:", timeit.timeit('sinc_cy_soln(x)', 'from __main__ import sinc_cy_soln,x', number=100)
+print "Array time:", timeit.timeit('sinc_solution.sinc_array(x)', 'from __main__ import sinc_solution,x', number=100)
+print "Fast array time:", timeit.timeit('sinc_solution.sinc_array(x, fast=True)', 'from __main__ import sinc_solution,x', number=100)
+print "Ufunc time:", timeit.timeit('sinc_solution.sinc_ufunc(x)', 'from __main__ import sinc_solution,x', number=100)
+print "NumPy where time:", timeit.timeit('sinc_python.sinc_numpy(x)', 'from __main__ import sinc_python,x', number=100)